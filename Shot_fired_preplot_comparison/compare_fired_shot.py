@@ -0,0 +1,154 @@
+import sys
+import os
+
+# shared navigation readers live in pythonProject
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pythonProject'))
+
+import numpy as np
+import pandas as pd
+
+from crs_registry import UTM15N_WGS84
+from p190_reader import read_srecords_batch
+from preplot_to_csv import PreplotToCsv
+
+COMPARISON_COLUMNS = ['linename', 'sp', 'jday', 'time', 'east', 'north', 'preplot_east', 'preplot_north',
+                      'inline', 'crossline', 'radial']
+
+
+class FiredShotComparison:
+    """
+    Compare fired shots from P1/90 S records with the densified preplot.
+
+    Fired shots are joined to preplot shots by line and SP, and every offset is
+    computed for the whole survey at once in the preplot line frame: inline is
+    along the line direction, crossline is positive to starboard of it and
+    radial is the straight miss distance.
+    """
+
+    def __init__(self, fired_files, preplot_path, crs=UTM15N_WGS84, spi=16.666666666667, line_map=None):
+        """
+        Args:
+            fired_files (str or list): P1/90 path, glob pattern or list of paths
+            preplot_path (str): P1/90 preplot with V records
+            crs (str): grid of the preplot and fired E/N
+            spi (float): shotpoint interval used to densify the preplot
+            line_map (callable): maps a fired line name to its preplot line name,
+                defaults to the name itself
+        """
+        self.fired_files = fired_files
+        self.preplot = PreplotToCsv(preplot_path, crs)
+        self.spi = spi
+        self.line_map = line_map
+        self._comparison = None
+        self._lookup = None
+
+    def fired_shots(self):
+        shots, _ = read_srecords_batch(self.fired_files)
+        return shots
+
+    def preplot_shots(self):
+        """Densified preplot shots with the azimuth of their line."""
+        lines = self.preplot.get_preplot_coordinates()
+        shots = self.preplot.get_preplot_shot_table(self.spi)
+        line_index = pd.Index(lines['linename'].astype(str)).get_indexer(shots['linename'].astype(str))
+        return shots.assign(line=line_index, Az=lines['Az'].to_numpy()[line_index])
+
+    def _preplot_lookup(self):
+        """Preplot line names, (line, sp) key index and E/N/azimuth arrays, built once."""
+        if self._lookup is None:
+            preplot = self.preplot_shots()
+            names = pd.Index(self.preplot.get_preplot_coordinates()['linename'].astype(str))
+            key = preplot['line'].to_numpy(dtype=np.int64) << 32 | preplot['sp'].to_numpy(dtype=np.int64)
+            self._lookup = (names, pd.Index(key), preplot['east'].to_numpy(), preplot['north'].to_numpy(),
+                            np.radians(preplot['Az'].to_numpy()))
+        return self._lookup
+
+    def offsets(self, fired):
+        """
+        Offsets of fired shots from their preplot position.
+
+        Fired shots whose line and SP are not in the preplot are dropped.
+
+        Args:
+            fired (DataFrame): decoded S records, see decode_s_records
+
+        Returns:
+            DataFrame: one row per matched fired shot, see COMPARISON_COLUMNS
+        """
+        names, preplot_key, preplot_east, preplot_north, preplot_az = self._preplot_lookup()
+
+        # preplot line of every fired line, mapped once per name rather than per shot
+        categories = fired['linename'].cat.categories
+        if self.line_map is not None:
+            categories = categories.map(self.line_map)
+        category_line = names.get_indexer(categories.astype(str))
+        fired_line = category_line[fired['linename'].cat.codes.to_numpy()]
+
+        # join on a single integer (line, sp) key
+        fired_key = fired_line.astype(np.int64) << 32 | fired['sp'].to_numpy(dtype=np.int64)
+        match = preplot_key.get_indexer(fired_key)
+        matched = (fired_line >= 0) & (match >= 0)
+
+        fired = fired[matched].reset_index(drop=True)
+        match = match[matched]
+
+        az = preplot_az[match]
+        d_east = fired['east'].to_numpy() - preplot_east[match]
+        d_north = fired['north'].to_numpy() - preplot_north[match]
+
+        df = fired[['linename', 'sp', 'jday', 'time', 'east', 'north']].assign(
+            preplot_east=preplot_east[match],
+            preplot_north=preplot_north[match],
+            inline=d_east * np.sin(az) + d_north * np.cos(az),
+            crossline=d_east * np.cos(az) - d_north * np.sin(az),
+            radial=np.hypot(d_east, d_north),
+        )
+        return df[COMPARISON_COLUMNS]
+
+    def compare(self):
+        """Offsets of every fired shot of the survey, see offsets."""
+        if self._comparison is None:
+            self._comparison = self.offsets(self.fired_shots())
+        return self._comparison
+
+    def line_stats(self, limit=None):
+        """
+        Per line crossline statistics.
+
+        Args:
+            limit (float): crossline limit in meters, adds an exceedance count when given
+
+        Returns:
+            DataFrame: shots, mean (signed), P95 and max (absolute) crossline and max radial per line
+        """
+        df = self.compare()
+        abs_crossline = df['crossline'].abs()
+        lines = df['linename']
+
+        stats = pd.DataFrame({
+            'shots': lines.groupby(lines, observed=True).size(),
+            'crossline_mean': df['crossline'].groupby(lines, observed=True).mean(),
+            'crossline_p95': abs_crossline.groupby(lines, observed=True).quantile(0.95),
+            'crossline_max': abs_crossline.groupby(lines, observed=True).max(),
+            'radial_max': df['radial'].groupby(lines, observed=True).max(),
+        })
+        if limit is not None:
+            over = abs_crossline > limit
+            stats['exceedances'] = over.groupby(lines, observed=True).sum()
+        return stats.reset_index()
+
+    def exceedances(self, limit=5.0, column='crossline'):
+        """Fired shots whose absolute inline, crossline or radial offset is over the limit."""
+        df = self.compare()
+        return df[df[column].abs() > limit].reset_index(drop=True)
+
+
+if __name__ == '__main__':
+
+    fired = r"Y:\NAV\01_Projects\0_MT2005724_Engament5_Gain_Test\Processed\*.p190"
+    preplot_fullpath = r"Y:\NAV\01_Projects\0_MT2005724_Engament5_Gain_Test\Preplots\Engagement5_20240705_SRC_WGS84_UTM15N_Orca.p190"
+    output_folder = r"Y:\NAV\01_Projects\0_MT2005724_Engament5_Gain_Test\QC"
+
+    comparison = FiredShotComparison(fired, preplot_fullpath)
+    print(comparison.line_stats(limit=5.0))
+    comparison.exceedances(limit=5.0).to_csv(os.path.join(output_folder, 'crossline_exceedances.csv'), index=False)
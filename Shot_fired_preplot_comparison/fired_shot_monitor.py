@@ -0,0 +1,174 @@
+import sys
+import os
+
+# shared navigation readers live in pythonProject
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pythonProject'))
+
+import numpy as np
+import pandas as pd
+
+from compare_fired_shot import COMPARISON_COLUMNS, FiredShotComparison
+from crs_registry import UTM15N_WGS84
+from p190_reader import CHUNK_SIZE, RECORD_LENGTH, decode_s_records, iter_buffers, record_block, record_starts
+
+RUNNING_SUM_COLUMNS = ['shots', 'crossline_sum', 'exceedances']
+RUNNING_MAX_COLUMNS = ['crossline_max', 'radial_max']
+
+
+class FiredShotMonitor:
+    """
+    Follow the online P1/90 while it is written and check every new shot against the preplot.
+
+    Only the bytes appended since the last read are decoded. Per line statistics
+    are kept as running sums, maxima and a fixed-bin histogram of the absolute
+    crossline for the P95, so the work per shot does not grow with the line.
+    The byte offset of the next unread record is kept in offset and can be
+    passed back in to resume after a restart.
+    """
+
+    def __init__(self, p190_path, preplot_path, crs=UTM15N_WGS84, spi=16.666666666667, line_map=None,
+                 limit=5.0, column='crossline', log_path=None, offset=0, resolution=0.1, max_offset=100.0):
+        """
+        Args:
+            p190_path (str): online P1/90 being written
+            preplot_path (str): P1/90 preplot with V records, see PreplotToCsv
+            crs, spi, line_map: see FiredShotComparison
+            limit (float): exceedance limit in meters
+            column (str): offset checked against the limit, inline, crossline or radial
+            log_path (str): CSV that every exceeding shot is appended to
+            offset (int): byte offset to start reading from
+            resolution (float): histogram bin width in meters, the precision of the P95
+            max_offset (float): larger absolute crosslines share the last histogram bin
+        """
+        self.p190_path = p190_path
+        self.comparison = FiredShotComparison(p190_path, preplot_path, crs, spi, line_map)
+        self.limit = limit
+        self.column = column
+        self.log_path = log_path
+        self.offset = offset
+        self.resolution = resolution
+        self.bins = int(round(max_offset / resolution)) + 1
+
+        self._stats = pd.DataFrame(columns=RUNNING_SUM_COLUMNS + RUNNING_MAX_COLUMNS, dtype=float)
+        self._histograms = {}
+        self._exceedances = []
+
+    def update(self, shots):
+        """Add the offsets of newly evaluated shots to the running statistics and exceedance log."""
+        if shots.empty:
+            return
+        lines = shots['linename'].astype(str)
+        abs_crossline = shots['crossline'].abs()
+        over = shots[self.column].abs() > self.limit
+
+        chunk = pd.DataFrame({
+            'shots': lines.groupby(lines).size(),
+            'crossline_sum': shots['crossline'].groupby(lines).sum(),
+            'exceedances': over.groupby(lines).sum(),
+            'crossline_max': abs_crossline.groupby(lines).max(),
+            'radial_max': shots['radial'].groupby(lines).max(),
+        }).astype(float)
+        union = self._stats.index.union(chunk.index)
+        stats = self._stats.reindex(union, fill_value=0.0)
+        chunk = chunk.reindex(union, fill_value=0.0)
+        stats[RUNNING_SUM_COLUMNS] += chunk[RUNNING_SUM_COLUMNS]
+        stats[RUNNING_MAX_COLUMNS] = np.maximum(stats[RUNNING_MAX_COLUMNS], chunk[RUNNING_MAX_COLUMNS])
+        self._stats = stats
+
+        codes, names = pd.factorize(lines)
+        bins = np.minimum((abs_crossline.to_numpy() / self.resolution).astype(np.int64), self.bins - 1)
+        counts = np.bincount(codes * self.bins + bins, minlength=len(names) * self.bins).reshape(len(names), -1)
+        for name, count in zip(names, counts):
+            self._histograms[name] = self._histograms.get(name, 0) + count
+
+        if over.any():
+            exceeding = shots[over.to_numpy()]
+            self._exceedances.append(exceeding)
+            if self.log_path:
+                exceeding.to_csv(self.log_path, mode='a', index=False, header=not os.path.exists(self.log_path))
+
+    def _evaluate(self, buf):
+        starts = record_starts(buf, b'S')
+        if len(starts) == 0:
+            return None
+        shots = self.comparison.offsets(decode_s_records(record_block(buf, starts)))
+        self.update(shots)
+        return shots
+
+    def poll(self, chunk_size=CHUNK_SIZE):
+        """
+        Evaluate the complete records appended since the last call and return their offsets.
+
+        A record still being written is left for the next call.
+        """
+        frames = []
+        with open(self.p190_path, 'rb') as f:
+            f.seek(self.offset)
+            for offset, buf in iter_buffers(f, chunk_size):
+                size = len(buf) - RECORD_LENGTH
+                if buf[size - 1] != ord('\n'):
+                    break
+                shots = self._evaluate(buf)
+                if shots is not None:
+                    frames.append(shots)
+                self.offset = offset + size
+        if not frames:
+            return pd.DataFrame(columns=COMPARISON_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def follow(self, poll_interval=0.2, chunk_size=CHUNK_SIZE):
+        """
+        Keep evaluating shots as they are written, never returns.
+
+        Yields:
+            DataFrame: offsets of each batch of new shots
+        """
+        with open(self.p190_path, 'rb') as f:
+            f.seek(self.offset)
+            for offset, buf in iter_buffers(f, chunk_size, follow=True, poll_interval=poll_interval):
+                shots = self._evaluate(buf)
+                self.offset = offset + len(buf) - RECORD_LENGTH
+                if shots is not None:
+                    yield shots
+
+    def _p95(self, name, shots):
+        cumulative = np.cumsum(self._histograms[name])
+        return (np.searchsorted(cumulative, 0.95 * shots) + 1) * self.resolution
+
+    def line_stats(self):
+        """
+        Running per line statistics, same columns as FiredShotComparison.line_stats.
+
+        crossline_p95 is the upper edge of the histogram bin holding the 95th
+        percentile shot, rather than an interpolated quantile.
+        """
+        stats = self._stats
+        df = pd.DataFrame({
+            'shots': stats['shots'].astype(int),
+            'crossline_mean': stats['crossline_sum'] / stats['shots'],
+            'crossline_p95': [min(self._p95(name, n), top) for name, n, top in
+                              zip(stats.index, stats['shots'], stats['crossline_max'])],
+            'crossline_max': stats['crossline_max'],
+            'radial_max': stats['radial_max'],
+            'exceedances': stats['exceedances'].astype(int),
+        }, index=stats.index.rename('linename'))
+        return df.reset_index()
+
+    def exceedances(self):
+        """Every exceeding shot seen so far."""
+        if not self._exceedances:
+            return pd.DataFrame(columns=COMPARISON_COLUMNS)
+        return pd.concat(self._exceedances, ignore_index=True)
+
+
+if __name__ == '__main__':
+
+    online = r"Y:\NAV\01_Projects\0_MT2005724_Engament5_Gain_Test\Online\current.p190"
+    preplot_fullpath = r"Y:\NAV\01_Projects\0_MT2005724_Engament5_Gain_Test\Preplots\Engagement5_20240705_SRC_WGS84_UTM15N_Orca.p190"
+    log_file = r"Y:\NAV\01_Projects\0_MT2005724_Engament5_Gain_Test\QC\crossline_exceedances_online.csv"
+
+    monitor = FiredShotMonitor(online, preplot_fullpath, limit=5.0, log_path=log_file)
+    for new_shots in monitor.follow():
+        last = new_shots.iloc[-1]
+        print(f"{last['linename']} SP {last['sp']}: crossline {last['crossline']:.1f} m, "
+              f"radial {last['radial']:.1f} m, {len(new_shots)} new")
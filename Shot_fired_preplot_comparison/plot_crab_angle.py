@@ -0,0 +1,166 @@
+import sys
+import os
+
+# shared navigation readers live in pythonProject
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pythonProject'))
+
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from analyze_vessel_data import plot_line_crab_angle, plot_line_gyro
+from eol_reader import EOLReport, find_eol_reports, section_columns
+from nav_cache import cached_parse
+
+# titles of the EOL report sections holding the vessel data
+CRAB_ANGLE_SECTION = "Vessel CMG and Crab Angle"
+GYRO_SECTION = "Gyro Headings"
+
+VESSEL_COLUMNS = ['Line', 'Shot', 'Time', 'CMG', 'Crab_Angle', 'Gyro']
+
+
+@cached_parse(version=3)
+def read_vessel_data(file_path):
+    """
+    Read the crab angle, CMG and gyro heading of every shot from one EOL report.
+
+    The report is indexed once and only these two sections are parsed.
+
+    Args:
+        file_path (str): Path to the EOL report
+
+    Returns:
+        DataFrame: Shot, Time, CMG, Crab_Angle and Gyro, NaN where a section has no value
+    """
+    with EOLReport(file_path) as sections:
+        crab = section_columns(sections, CRAB_ANGLE_SECTION, {'Shot': 0, 'Time': 1, 'CMG': 2, 'Crab_Angle': -1})
+        gyro = section_columns(sections, GYRO_SECTION, {'Shot': 0, 'Time': 1, 'Gyro': -1})
+    if crab is None and gyro is None:
+        return pd.DataFrame(columns=VESSEL_COLUMNS[1:])
+    if crab is None:
+        crab = pd.DataFrame(columns=['Shot', 'Time', 'CMG', 'Crab_Angle'])
+    if gyro is None:
+        gyro = pd.DataFrame(columns=['Shot', 'Time', 'Gyro'])
+
+    df = crab.merge(gyro, on='Shot', how='outer', suffixes=('', '_gyro'))
+    df['Time'] = df['Time'].fillna(df.pop('Time_gyro'))
+    return df[VESSEL_COLUMNS[1:]]
+
+
+def _line_name(file_path):
+    return os.path.basename(file_path).replace('-EOL_Report.csv', '')
+
+
+def load_vessel_table(reports, workers=None):
+    """
+    Read the vessel data of every EOL report into one table.
+
+    Args:
+        reports (list): EOL report paths, see find_eol_reports
+        workers (int): number of worker processes, defaults to the cpu count
+
+    Returns:
+        DataFrame: one row per shot with a categorical Line column, see VESSEL_COLUMNS
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(read_vessel_data, reports))
+
+    lines = [_line_name(file_path) for file_path in reports]
+    df = pd.concat(frames, keys=lines, names=['Line', None]).reset_index(level='Line').reset_index(drop=True)
+    df['Line'] = pd.Categorical(df['Line'], categories=sorted(set(lines)))
+    return df[VESSEL_COLUMNS]
+
+
+def line_summary(vessel_df):
+    """Per line crab angle, CMG and gyro statistics with the line direction."""
+    lines = vessel_df.groupby('Line', observed=True)
+    summary = lines.agg(
+        shots=('Shot', 'size'),
+        crab_mean=('Crab_Angle', 'mean'),
+        crab_max=('Crab_Angle', 'max'),
+        crab_min=('Crab_Angle', 'min'),
+        cmg_mean=('CMG', 'mean'),
+        gyro_mean=('Gyro', 'mean'),
+    )
+    summary['direction'] = np.where((summary['cmg_mean'] >= 270) | (summary['cmg_mean'] <= 90), '0°', '180°')
+    return summary.reset_index()
+
+
+def plot_crab_vs_cmg(vessel_df, output_folder):
+    """Survey wide scatter of crab angle against CMG."""
+    fig, ax = plt.subplots(figsize=(15, 8))
+    ax.scatter(vessel_df['CMG'], vessel_df['Crab_Angle'], s=1, alpha=0.3)
+    ax.set_title(f'Crab Angle vs CMG, {vessel_df["Line"].nunique()} lines')
+    ax.set_xlabel('CMG (degrees)')
+    ax.set_ylabel('Crab Angle (degrees)')
+    ax.set_xlim(0, 360)
+    ax.grid(True)
+    path = os.path.join(output_folder, 'survey_crab_angle_vs_cmg.png')
+    fig.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    return path
+
+
+def plot_crab_boxplot(vessel_df, output_folder):
+    """Survey wide boxplot of the crab angle of every line."""
+    data = vessel_df.dropna(subset=['Crab_Angle'])
+    lines = data.groupby('Line', observed=True)['Crab_Angle']
+    names = list(lines.groups)
+
+    fig, ax = plt.subplots(figsize=(max(15, len(names) * 0.3), 8))
+    ax.boxplot([values.to_numpy() for _, values in lines], showfliers=False)
+    ax.set_xticks(range(1, len(names) + 1), names, rotation=90, fontsize=6)
+    ax.set_title('Crab Angle per Line')
+    ax.set_xlabel('Line')
+    ax.set_ylabel('Crab Angle (degrees)')
+    ax.grid(True, axis='y')
+    path = os.path.join(output_folder, 'survey_crab_angle_boxplot.png')
+    fig.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    return path
+
+
+def _render_line(line_df, line_name, output_folder):
+    return [plot_line_crab_angle(line_df, line_name, output_folder),
+            plot_line_gyro(line_df, line_name, output_folder)]
+
+
+def render_survey(vessel_df, output_folder, workers=None):
+    """
+    Render the survey views and the plots of every line from the vessel table.
+
+    Lines are drawn in a process pool, each worker gets the rows of its line
+    so no report is read again.
+
+    Args:
+        vessel_df (DataFrame): see load_vessel_table
+        output_folder (str): folder the PNG files are written to
+        workers (int): number of worker processes, defaults to the cpu count
+
+    Returns:
+        list: paths of the written plots
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    paths = [plot_crab_vs_cmg(vessel_df, output_folder), plot_crab_boxplot(vessel_df, output_folder)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_render_line, line_df, str(line_name), output_folder)
+                   for line_name, line_df in vessel_df.groupby('Line', observed=True, sort=False)]
+        for future in futures:
+            paths += [path for path in future.result() if path]
+    return paths
+
+
+if __name__ == '__main__':
+
+    root_folder = r'Z:\MT3007424\Murphy_KMS_3D_OBN\00_NAV'
+    output_folder = r'Y:\NAV\01_Projects\0_KMS_3D_OBN_MT3007424\Vessel_Data_Analysis'
+
+    vessel_df = load_vessel_table(find_eol_reports(root_folder))
+    print(line_summary(vessel_df))
+    render_survey(vessel_df, output_folder)
+    print("Processing complete!")
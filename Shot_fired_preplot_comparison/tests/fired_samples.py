@@ -0,0 +1,53 @@
+"""Synthetic preplot and fired shot P1/90 files, shared by the comparison and monitor tests."""
+import math
+
+SPI = 25.0
+
+# linename, first SP, start easting/northing, azimuth and number of shots
+LINES = [
+    ('KMS1001', 1001, 500000.0, 3000000.0, 0.0, 21),
+    ('KMS1002', 2001, 501000.0, 3000000.0, 90.0, 21),
+]
+
+
+def preplot_position(line, sp):
+    name, first_sp, east, north, azimuth, _ = next(row for row in LINES if row[0] == line)
+    a = math.radians(azimuth)
+    d = (sp - first_sp) * SPI
+    return east + d * math.sin(a), north + d * math.cos(a)
+
+
+def v_record(line, sp, east, north):
+    record = f'V{line:<12}{"":7}{sp:>5}{"274500.00N":>10}{"0901500.00W":>11} {east:8.1f}{north:9.1f}'
+    return f'{record:<80}'
+
+
+def s_record(line, sp, east, north, i=0):
+    hms = f'{(i // 3600) % 24:02d}{(i // 60) % 60:02d}{i % 60:02d}'
+    record = (f'S{line:<12}   111 {sp:>5}{"274500.00N":>10}{"0901500.00W":>11} '
+              f'{east:8.1f}{north:9.1f}{6.0:6.1f}{100:03d}{hms} ')
+    assert len(record) == 80
+    return record
+
+
+def write_preplot(path):
+    records = []
+    for line, first_sp, *_, count in LINES:
+        for sp in range(first_sp, first_sp + count):
+            records.append(v_record(line, sp, *preplot_position(line, sp)))
+    path.write_text('\n'.join(records) + '\n')
+    return str(path)
+
+
+def fired_records(shots):
+    """S records of (line, sp, east offset, north offset) shots, offsets from the preplot position."""
+    records = []
+    for i, (line, sp, d_east, d_north) in enumerate(shots):
+        east, north = preplot_position(line, sp)
+        records.append(s_record(line, sp, east + d_east, north + d_north, i))
+    return records
+
+
+def write_fired(path, shots):
+    path.write_text(''.join(record + '\n' for record in fired_records(shots)))
+    return str(path)
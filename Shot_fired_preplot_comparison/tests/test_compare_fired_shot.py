@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from compare_fired_shot import COMPARISON_COLUMNS, FiredShotComparison
+from fired_samples import SPI, fired_records, s_record, write_fired, write_preplot
+
+
+def test_offsets_in_line_frame(tmp_path):
+    preplot = write_preplot(tmp_path / 'preplot.p190')
+    # 3 m east of a northbound line and 3 m south of an eastbound one are both 3 m to starboard
+    records = fired_records([('KMS1001', 1005, 3.0, 2.0), ('KMS1002', 2010, 1.0, -3.0), ('KMS1002', 2050, 0.0, 0.0)])
+    fired = tmp_path / 'fired.p190'
+    fired.write_text('\n'.join(records + [s_record('KMS9999', 1001, 500000.0, 3000000.0)]) + '\n')
+    df = FiredShotComparison(str(fired), preplot, spi=SPI).compare()
+
+    assert list(df.columns) == COMPARISON_COLUMNS
+    # shots off the end of the preplot or on an unknown line are dropped
+    assert df['sp'].tolist() == [1005, 2010]
+    assert df['inline'].tolist() == pytest.approx([2.0, 1.0])
+    assert df['crossline'].tolist() == pytest.approx([3.0, 3.0])
+    assert df['radial'].tolist() == pytest.approx([np.hypot(3, 2), np.hypot(1, 3)])
+
+
+def test_line_stats(tmp_path):
+    preplot = write_preplot(tmp_path / 'preplot.p190')
+    crossline = [-1.0, 2.0, -6.0, 0.5]
+    fired = write_fired(tmp_path / 'fired.p190', [('KMS1001', 1001 + i, d, 0.0) for i, d in enumerate(crossline)])
+    comparison = FiredShotComparison(fired, preplot, spi=SPI)
+
+    stats = comparison.line_stats(limit=5.0)
+    assert stats['linename'].tolist() == ['KMS1001']
+    assert stats['shots'].tolist() == [4]
+    assert stats['crossline_mean'].tolist() == pytest.approx([np.mean(crossline)])
+    assert stats['crossline_p95'].tolist() == pytest.approx([np.quantile(np.abs(crossline), 0.95)])
+    assert stats['crossline_max'].tolist() == pytest.approx([6.0])
+    assert stats['exceedances'].tolist() == [1]
+    assert comparison.exceedances(limit=5.0)['sp'].tolist() == [1003]
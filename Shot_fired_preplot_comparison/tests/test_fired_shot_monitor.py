@@ -0,0 +1,53 @@
+import numpy as np
+
+from compare_fired_shot import FiredShotComparison
+from fired_samples import SPI, fired_records, write_fired, write_preplot
+from fired_shot_monitor import FiredShotMonitor
+
+
+def test_poll_holds_back_partial_record(tmp_path):
+    preplot = write_preplot(tmp_path / 'preplot.p190')
+    records = fired_records([('KMS1001', sp, 6.0 if sp == 1004 else 1.0, 0.0) for sp in range(1001, 1007)])
+    online = tmp_path / 'online.p190'
+    # the fourth record is still being written
+    online.write_text(''.join(record + '\n' for record in records[:3]) + records[3][:40])
+
+    monitor = FiredShotMonitor(str(online), preplot, spi=SPI)
+    assert monitor.poll()['sp'].tolist() == [1001, 1002, 1003]
+    assert monitor.offset == 3 * 81
+    assert monitor.poll().empty
+
+    with open(online, 'a') as f:
+        f.write(records[3][40:] + '\n' + ''.join(record + '\n' for record in records[4:]))
+    assert monitor.poll()['sp'].tolist() == [1004, 1005, 1006]
+    assert monitor.line_stats()['shots'].tolist() == [6]
+    assert monitor.exceedances()['sp'].tolist() == [1004]
+
+    # a restarted monitor picks up from the saved offset
+    with open(online, 'a') as f:
+        f.write(fired_records([('KMS1001', 1007, 1.0, 0.0)])[0] + '\n')
+    resumed = FiredShotMonitor(str(online), preplot, spi=SPI, offset=monitor.offset)
+    assert resumed.poll()['sp'].tolist() == [1007]
+
+
+def test_running_stats_match_comparison(tmp_path):
+    preplot = write_preplot(tmp_path / 'preplot.p190')
+    rng = np.random.default_rng(7)
+    shots = [(line, first_sp + i, d, 0.0) for line, first_sp in (('KMS1001', 1001), ('KMS1002', 2001))
+             for i, d in enumerate(rng.uniform(-8, 8, 21).round(1))]
+    fired = write_fired(tmp_path / 'fired.p190', shots)
+
+    # fed in small chunks, the running statistics add up to those of the whole file
+    monitor = FiredShotMonitor(fired, preplot, spi=SPI, resolution=0.1)
+    monitor.poll(chunk_size=500)
+    running = monitor.line_stats().set_index('linename')
+    exact = FiredShotComparison(fired, preplot, spi=SPI).line_stats(limit=5.0).set_index('linename')
+
+    assert running['shots'].tolist() == exact['shots'].tolist()
+    assert running['exceedances'].tolist() == exact['exceedances'].tolist()
+    assert np.allclose(running['crossline_mean'], exact['crossline_mean'])
+    assert np.allclose(running['crossline_max'], exact['crossline_max'])
+    # the histogram P95 is the upper edge of its bin, capped at the line maximum
+    assert (running['crossline_p95'] >= exact['crossline_p95'] - 1e-9).all()
+    assert (running['crossline_p95'] - exact['crossline_p95'] <= 0.1 + 1e-9).all()
+    assert (running['crossline_p95'] <= running['crossline_max']).all()
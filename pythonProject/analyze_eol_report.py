@@ -8,6 +8,8 @@ import os
 from pathlib import Path
 import re
 
+from eol_reader import read_eol_sections
+
 Base = declarative_base()
 
 class EOLFile(Base):
@@ -76,10 +78,11 @@ def init_database(database_url: str):
     Base.metadata.create_all(engine)
     return engine
 
-def process_eol_file(file_path: str, engine, session):
-    """Process a single EOL file and store in database"""
+def process_eol_file(file_path: str, engine, session, sections=None):
+    """Process a single EOL file and store in database, sections of an already open report can be passed in"""
     # Parse file using existing parse_eol_sections function
-    sections = parse_eol_sections(file_path)
+    if sections is None:
+        sections = parse_eol_sections(file_path)
     
     # Create file record
     file_record = EOLFile(
@@ -93,9 +96,10 @@ def process_eol_file(file_path: str, engine, session):
     session.add(file_record)
     session.flush()  # Get the file_id
     
-    # Process each section
-    for section_name, df in sections.items():
+    # Process each section, looked up by title so an EOLReport only parses these
+    for section_name in sections:
         if section_name == "Network Quality":
+            df = sections[section_name]
             for _, row in df.iterrows():
                 record = NetworkQuality(
                     file_id=file_record.id,
@@ -107,6 +111,7 @@ def process_eol_file(file_path: str, engine, session):
                 session.add(record)
                 
         elif section_name == "Shot Point Interval":
+            df = sections[section_name]
             for _, row in df.iterrows():
                 record = ShotPointInterval(
                     file_id=file_record.id,
@@ -178,7 +183,7 @@ def get_example_queries(engine):
 def parse_eol_sections(file_path: str) -> dict:
     """
     Parse EOL Report file into sections and convert to pandas DataFrames.
-    Converts 'Time' columns to datetime objects.
+    Converts 'Time' columns to datetime objects, numeric columns are numbers.
     
     Args:
         file_path (str): Path to the EOL report file
@@ -186,69 +191,7 @@ def parse_eol_sections(file_path: str) -> dict:
     Returns:
         dict: Dictionary with section titles as keys containing pandas DataFrames
     """
-    sections = {}
-    current_section = None
-    current_headers = None
-    current_data = []
-    
-    with open(file_path, 'r') as f:
-        # Skip first line (EOL_Report)
-        next(f)
-        
-        # Skip initial empty line if present
-        line = next(f).strip()
-        if not line:
-            line = next(f).strip()
-            
-        while True:
-            try:
-                # New section starts with title
-                if current_section is None:
-                    current_section = line
-                    
-                    # Skip empty line after title
-                    next(f)
-                    
-                    # Get headers
-                    current_headers = next(f).strip().split(',')
-                    
-                    # Skip empty line after headers
-                    next(f)
-                    
-                    # Start reading data
-                    line = next(f).strip()
-                    current_data = []
-                    continue
-                
-                # Empty line marks end of current section
-                if not line:
-                    # Convert collected data to DataFrame
-                    df = pd.DataFrame(current_data, columns=current_headers)
-                    
-                    # Convert Time column to datetime if it exists
-                    if 'Time' in df.columns:
-                        df['Time'] = pd.to_datetime(df['Time'], format='%d/%m/%Y %H:%M:%S')
-                    
-                    sections[current_section] = df
-                    current_section = None
-                    current_data = []
-                    line = next(f).strip()
-                    continue
-                    
-                # Add data row to current section
-                current_data.append(line.split(','))
-                line = next(f).strip()
-                
-            except StopIteration:
-                # Convert last section if exists
-                if current_section and current_data:
-                    df = pd.DataFrame(current_data, columns=current_headers)
-                    if 'Time' in df.columns:
-                        df['Time'] = pd.to_datetime(df['Time'], format='%d/%m/%Y %H:%M:%S')
-                    sections[current_section] = df
-                break
-                
-    return sections
+    return read_eol_sections(file_path)
 
 
 def clean_table_name(name: str) -> str:
@@ -1,8 +1,13 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
+import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import Dict
+
+from eol_reader import EOLReport, find_eol_reports, section_columns
 
 class NetworkDataAnalyzer:
     def __init__(self, root_folder: str, output_folder: str):
@@ -10,40 +15,11 @@ class NetworkDataAnalyzer:
         self.output_folder = output_folder
         os.makedirs(output_folder, exist_ok=True)
         
-    def extract_section_data(self, lines: List[str], start_marker: str, end_marker: str) -> Tuple[List[str], int]:
-        """Extract data between markers and return the section with its start index"""
-        try:
-            start_idx = next(i for i, line in enumerate(lines) if start_marker in line)
-            end_idx = next(i for i, line in enumerate(lines[start_idx:]) if end_marker in line)
-            return lines[start_idx:start_idx + end_idx], start_idx
-        except StopIteration:
-            return [], -1
-
-    def process_network_quality(self, lines: List[str], line_name: str) -> pd.DataFrame:
+    def process_network_quality(self, sections: EOLReport, line_name: str) -> pd.DataFrame:
         """Process network quality data and create visualization"""
-        section_data, _ = self.extract_section_data(lines, "Network Quality", "Shot Point Interval")
-        if not section_data:
+        df = section_columns(sections, "Network Quality", {'Shot': 0, 'Time': 1, 'DOF': 2, 'Quality': 3})
+        if df is None:
             return None
-
-        # Process data
-        data = []
-        for line in section_data[2:]:  # Skip header rows
-            try:
-                parts = line.strip().split(',')
-                if len(parts) >= 4:
-                    data.append({
-                        'Shot': int(parts[0]),
-                        'Time': parts[1],
-                        'DOF': float(parts[2]),
-                        'Quality': float(parts[3])
-                    })
-            except (ValueError, IndexError):
-                continue
-
-        if not data:
-            return None
-
-        df = pd.DataFrame(data)
         
         # Create plot
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 12), sharex=True)
@@ -98,30 +74,11 @@ class NetworkDataAnalyzer:
         
         return df
 
-    def process_shot_interval(self, lines: List[str], line_name: str) -> pd.DataFrame:
+    def process_shot_interval(self, sections: EOLReport, line_name: str) -> pd.DataFrame:
         """Process shot point interval data and create visualization"""
-        section_data, _ = self.extract_section_data(lines, "Shot Point Interval", "Vessel CMG")
-        if not section_data:
+        df = section_columns(sections, "Shot Point Interval", {'Shot': 0, 'Time': 1, 'Interval': 2})
+        if df is None:
             return None
-
-        # Process data
-        data = []
-        for line in section_data[2:]:  # Skip header rows
-            try:
-                parts = line.strip().split(',')
-                if len(parts) >= 3:
-                    data.append({
-                        'Shot': int(parts[0]),
-                        'Time': parts[1],
-                        'Interval': float(parts[2])
-                    })
-            except (ValueError, IndexError):
-                continue
-
-        if not data:
-            return None
-
-        df = pd.DataFrame(data)
         
         # Create plot
         plt.figure(figsize=(15, 8))
@@ -169,36 +126,48 @@ class NetworkDataAnalyzer:
         
         return df
 
-    def process_file(self, file_path: str) -> None:
-        """Process a single EOL report file"""
+    def process_file(self, file_path: str) -> str:
+        """Process a single EOL report file, returns the error message or None"""
         try:
-            # Read file
-            with open(file_path, 'r') as file:
-                lines = file.readlines()
-                
             # Get line name from filename
             line_name = os.path.basename(file_path).replace('-EOL_Report.csv', '')
             
-            # Process network quality and shot interval data
-            network_df = self.process_network_quality(lines, line_name)
-            interval_df = self.process_shot_interval(lines, line_name)
+            # Open the report, only the sections plotted here are parsed
+            with EOLReport(file_path, parse_time=False) as sections:
+                network_df = self.process_network_quality(sections, line_name)
+                interval_df = self.process_shot_interval(sections, line_name)
             
             print(f"Processed: {line_name}")
+            return None
             
         except Exception as e:
             print(f"Error processing file {file_path}: {str(e)}")
+            return str(e)
 
-    def process_all_files(self) -> None:
-        """Process all EOL report files in the root folder"""
-        for root, dirs, files in os.walk(self.root_folder):
-            for file in files:
-                if file.endswith('-EOL_Report.csv') and file[0].isdigit():
-                    if file.lower().startswith(('test', 'bble')):
-                        continue
-                    file_path = os.path.join(root, file)
-                    self.process_file(file_path)
-        
+    def process_all_files(self, jobs: int = 1) -> Dict[str, str]:
+        """
+        Process all EOL report files in the root folder
+
+        With jobs > 1 the files are processed in that many worker processes,
+        each rendering with the non-interactive Agg backend.
+
+        Returns:
+            dict: error message of every file that failed
+        """
+        reports = find_eol_reports(self.root_folder)
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=matplotlib.use, initargs=('Agg',)) as pool:
+                outcomes = list(pool.map(self.process_file, reports))
+        else:
+            outcomes = [self.process_file(file_path) for file_path in reports]
+
+        errors = {file_path: error for file_path, error in zip(reports, outcomes) if error is not None}
         print("Processing complete!")
+        if errors:
+            print(f"{len(errors)} of {len(reports)} files failed:")
+            for file_path, error in errors.items():
+                print(f"  {file_path}: {error}")
+        return errors
 
 def main():
     # Configure folders
@@ -207,7 +176,7 @@ def main():
     
     # Create and run analyzer
     analyzer = NetworkDataAnalyzer(root_folder, output_folder)
-    analyzer.process_all_files()
+    analyzer.process_all_files(jobs=os.cpu_count())
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,8 +1,90 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
+import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import Dict
+
+from eol_reader import EOLReport, find_eol_reports, section_columns
+
+
+def plot_line_crab_angle(line_df: pd.DataFrame, line_name: str, output_folder: str) -> str:
+    """Crab angle vs shot number of one line, None when it has no crab angle. Returns the PNG path."""
+    df = line_df.dropna(subset=['Crab_Angle'])
+    if df.empty:
+        return None
+
+    fig, ax = plt.subplots(figsize=(15, 8))
+    ax.plot(df['Shot'], df['Crab_Angle'], label='Crab Angle')
+
+    avg_angle = df['Crab_Angle'].mean()
+    max_angle = df['Crab_Angle'].max()
+    min_angle = df['Crab_Angle'].min()
+    avg_cmg = df['CMG'].mean()
+
+    ax.axhline(y=avg_angle, color='r', linestyle='--', label=f'Average: {avg_angle:.2f}°')
+    ax.axhline(y=max_angle, color='g', linestyle=':', label=f'Max: {max_angle:.2f}°')
+    ax.axhline(y=min_angle, color='y', linestyle=':', label=f'Min: {min_angle:.2f}°')
+
+    line_direction = "0°" if 270 <= avg_cmg <= 360 or 0 <= avg_cmg <= 90 else "180°"
+
+    ax.set_title(f'Line {line_name}: Crab Angle vs Shot Number (Line Direction: {line_direction})')
+    ax.set_xlabel('Shot Number')
+    ax.set_ylabel('Crab Angle (degrees)')
+    ax.grid(True)
+    ax.legend()
+
+    stats_text = (f'Statistics:\n'
+                  f'Shots: {len(df)}\n'
+                  f'Average: {avg_angle:.2f}°\n'
+                  f'Maximum: {max_angle:.2f}°\n'
+                  f'Minimum: {min_angle:.2f}°\n'
+                  f'Avg CMG: {avg_cmg:.2f}°')
+    ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, verticalalignment='top',
+            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+
+    path = os.path.join(output_folder, f'{line_name}_crab_angle.png')
+    fig.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    return path
+
+
+def plot_line_gyro(line_df: pd.DataFrame, line_name: str, output_folder: str) -> str:
+    """Gyro heading vs shot number of one line, None when it has no gyro heading. Returns the PNG path."""
+    df = line_df.dropna(subset=['Gyro'])
+    if df.empty:
+        return None
+
+    fig, ax = plt.subplots(figsize=(15, 8))
+    ax.plot(df['Shot'], df['Gyro'], label='Gyro Heading')
+
+    avg_gyro = df['Gyro'].mean()
+    max_gyro = df['Gyro'].max()
+    min_gyro = df['Gyro'].min()
+
+    ax.axhline(y=avg_gyro, color='r', linestyle='--', label=f'Average: {avg_gyro:.2f}°')
+
+    ax.set_title(f'Line {line_name}: Gyro Heading vs Shot Number')
+    ax.set_xlabel('Shot Number')
+    ax.set_ylabel('Gyro Heading (degrees)')
+    ax.grid(True)
+    ax.legend()
+
+    stats_text = (f'Statistics:\n'
+                  f'Shots: {len(df)}\n'
+                  f'Average: {avg_gyro:.2f}°\n'
+                  f'Maximum: {max_gyro:.2f}°\n'
+                  f'Minimum: {min_gyro:.2f}°')
+    ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, verticalalignment='top',
+            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+
+    path = os.path.join(output_folder, f'{line_name}_gyro_heading.png')
+    fig.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    return path
+
 
 class VesselDataAnalyzer:
     def __init__(self, root_folder: str, output_folder: str):
@@ -10,185 +92,66 @@ class VesselDataAnalyzer:
         self.output_folder = output_folder
         os.makedirs(output_folder, exist_ok=True)
         
-    def extract_section_data(self, lines: List[str], start_marker: str, end_marker: str) -> Tuple[List[str], int]:
-        """Extract data between markers and return the section with its start index"""
-        try:
-            start_idx = next(i for i, line in enumerate(lines) if start_marker in line)
-            end_idx = next(i for i, line in enumerate(lines[start_idx:]) if end_marker in line)
-            return lines[start_idx:start_idx + end_idx], start_idx
-        except StopIteration:
-            return [], -1
-
-    def process_crab_angle_data(self, lines: List[str], line_name: str) -> pd.DataFrame:
+    def process_crab_angle_data(self, sections: EOLReport, line_name: str) -> pd.DataFrame:
         """Process crab angle data and create visualization"""
-        section_data, _ = self.extract_section_data(lines, "Vessel CMG and Crab Angle", "Gyro Headings")
-        if not section_data:
+        df = section_columns(sections, "Vessel CMG and Crab Angle", {'Shot': 0, 'Time': 1, 'CMG': 2, 'Crab_Angle': -1})
+        if df is None:
             return None
-
-        # Process data
-        data = []
-        for line in section_data[2:]:  # Skip header rows
-            try:
-                parts = line.strip().split(',')
-                if len(parts) >= 3:
-                    data.append({
-                        'Shot': int(parts[0]),
-                        'Time': parts[1],
-                        'CMG': float(parts[2]),
-                        'Crab_Angle': float(parts[-1])
-                    })
-            except (ValueError, IndexError):
-                continue
-
-        if not data:
-            return None
-
-        df = pd.DataFrame(data)
-        
-        # Create plot
-        plt.figure(figsize=(15, 8))
-        
-        # Plot crab angle
-        plt.plot(df['Shot'], df['Crab_Angle'], label='Crab Angle')
-        
-        # Calculate and plot statistics
-        avg_angle = df['Crab_Angle'].mean()
-        max_angle = df['Crab_Angle'].max()
-        min_angle = df['Crab_Angle'].min()
-        avg_cmg = df['CMG'].mean()
-        
-        plt.axhline(y=avg_angle, color='r', linestyle='--', label=f'Average: {avg_angle:.2f}°')
-        plt.axhline(y=max_angle, color='g', linestyle=':', label=f'Max: {max_angle:.2f}°')
-        plt.axhline(y=min_angle, color='y', linestyle=':', label=f'Min: {min_angle:.2f}°')
-        
-        # Determine line direction
-        line_direction = "0°" if 270 <= avg_cmg <= 360 or 0 <= avg_cmg <= 90 else "180°"
-        
-        plt.title(f'Line {line_name}: Crab Angle vs Shot Number (Line Direction: {line_direction})')
-        plt.xlabel('Shot Number')
-        plt.ylabel('Crab Angle (degrees)')
-        plt.grid(True)
-        plt.legend()
-        
-        # Add statistics text box
-        stats_text = (f'Statistics:\n'
-                     f'Shots: {len(df)}\n'
-                     f'Average: {avg_angle:.2f}°\n'
-                     f'Maximum: {max_angle:.2f}°\n'
-                     f'Minimum: {min_angle:.2f}°\n'
-                     f'Avg CMG: {avg_cmg:.2f}°')
-        
-        plt.text(0.02, 0.98, stats_text,
-                transform=plt.gca().transAxes,
-                verticalalignment='top',
-                bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
-        
-        # Save plot
-        plt.savefig(
-            os.path.join(self.output_folder, f'{line_name}_crab_angle.png'),
-            dpi=300,
-            bbox_inches='tight'
-        )
-        plt.close()
         
+        plot_line_crab_angle(df, line_name, self.output_folder)
         return df
 
-    def process_gyro_data(self, lines: List[str], line_name: str) -> pd.DataFrame:
+    def process_gyro_data(self, sections: EOLReport, line_name: str) -> pd.DataFrame:
         """Process gyro heading data and create visualization"""
-        section_data, _ = self.extract_section_data(lines, "Gyro Headings", "Network Quality")
-        if not section_data:
-            return None
-
-        # Process data
-        data = []
-        for line in section_data[2:]:  # Skip header rows
-            try:
-                parts = line.strip().split(',')
-                if len(parts) >= 3:
-                    data.append({
-                        'Shot': int(parts[0]),
-                        'Time': parts[1],
-                        'Gyro': float(parts[-1])
-                    })
-            except (ValueError, IndexError):
-                continue
-
-        if not data:
+        df = section_columns(sections, "Gyro Headings", {'Shot': 0, 'Time': 1, 'Gyro': -1})
+        if df is None:
             return None
-
-        df = pd.DataFrame(data)
-        
-        # Create plot
-        plt.figure(figsize=(15, 8))
-        
-        # Plot gyro heading
-        plt.plot(df['Shot'], df['Gyro'], label='Gyro Heading')
-        
-        # Calculate and plot statistics
-        avg_gyro = df['Gyro'].mean()
-        max_gyro = df['Gyro'].max()
-        min_gyro = df['Gyro'].min()
-        
-        plt.axhline(y=avg_gyro, color='r', linestyle='--', label=f'Average: {avg_gyro:.2f}°')
-        
-        plt.title(f'Line {line_name}: Gyro Heading vs Shot Number')
-        plt.xlabel('Shot Number')
-        plt.ylabel('Gyro Heading (degrees)')
-        plt.grid(True)
-        plt.legend()
-        
-        # Add statistics text box
-        stats_text = (f'Statistics:\n'
-                     f'Shots: {len(df)}\n'
-                     f'Average: {avg_gyro:.2f}°\n'
-                     f'Maximum: {max_gyro:.2f}°\n'
-                     f'Minimum: {min_gyro:.2f}°')
-        
-        plt.text(0.02, 0.98, stats_text,
-                transform=plt.gca().transAxes,
-                verticalalignment='top',
-                bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
-        
-        # Save plot
-        plt.savefig(
-            os.path.join(self.output_folder, f'{line_name}_gyro_heading.png'),
-            dpi=300,
-            bbox_inches='tight'
-        )
-        plt.close()
         
+        plot_line_gyro(df, line_name, self.output_folder)
         return df
 
-    def process_file(self, file_path: str) -> None:
-        """Process a single EOL report file"""
+    def process_file(self, file_path: str) -> str:
+        """Process a single EOL report file, returns the error message or None"""
         try:
-            # Read file
-            with open(file_path, 'r') as file:
-                lines = file.readlines()
-                
             # Get line name from filename
             line_name = os.path.basename(file_path).replace('-EOL_Report.csv', '')
             
-            # Process crab angle and gyro data
-            crab_df = self.process_crab_angle_data(lines, line_name)
-            gyro_df = self.process_gyro_data(lines, line_name)
+            # Open the report, only the sections plotted here are parsed
+            with EOLReport(file_path, parse_time=False) as sections:
+                crab_df = self.process_crab_angle_data(sections, line_name)
+                gyro_df = self.process_gyro_data(sections, line_name)
             
             print(f"Processed: {line_name}")
+            return None
             
         except Exception as e:
             print(f"Error processing file {file_path}: {str(e)}")
+            return str(e)
 
-    def process_all_files(self) -> None:
-        """Process all EOL report files in the root folder"""
-        for root, dirs, files in os.walk(self.root_folder):
-            for file in files:
-                if file.endswith('-EOL_Report.csv') and file[0].isdigit():
-                    if file.lower().startswith(('test', 'bble')):
-                        continue
-                    file_path = os.path.join(root, file)
-                    self.process_file(file_path)
-        
+    def process_all_files(self, jobs: int = 1) -> Dict[str, str]:
+        """
+        Process all EOL report files in the root folder
+
+        With jobs > 1 the files are processed in that many worker processes,
+        each rendering with the non-interactive Agg backend.
+
+        Returns:
+            dict: error message of every file that failed
+        """
+        reports = find_eol_reports(self.root_folder)
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=matplotlib.use, initargs=('Agg',)) as pool:
+                outcomes = list(pool.map(self.process_file, reports))
+        else:
+            outcomes = [self.process_file(file_path) for file_path in reports]
+
+        errors = {file_path: error for file_path, error in zip(reports, outcomes) if error is not None}
         print("Processing complete!")
+        if errors:
+            print(f"{len(errors)} of {len(reports)} files failed:")
+            for file_path, error in errors.items():
+                print(f"  {file_path}: {error}")
+        return errors
 
 def main():
     # Configure folders
@@ -197,7 +160,7 @@ def main():
     
     # Create and run analyzer
     analyzer = VesselDataAnalyzer(root_folder, output_folder)
-    analyzer.process_all_files()
+    analyzer.process_all_files(jobs=os.cpu_count())
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
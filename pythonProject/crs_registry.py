@@ -0,0 +1,43 @@
+import functools
+
+from pyproj import Transformer
+
+# project grids
+UTM15N_WGS84 = 'EPSG:32615'
+UTM15N_NAD27 = 'EPSG:26715'
+
+# geographic
+WGS84 = 'EPSG:4326'
+NAD27 = 'EPSG:4267'
+
+
+@functools.lru_cache(maxsize=32)
+def get_transformer(source_crs, target_crs=WGS84):
+    """
+    Shared pyproj Transformer for a (source, target) CRS pair.
+
+    Building a transformer, and loading any datum grid shift it needs, is done
+    once per pair per process. Axis order is always x/y (easting/longitude first).
+    """
+    return Transformer.from_crs(source_crs, target_crs, always_xy=True)
+
+
+def grid_to_geographic(easting, northing, source_crs=UTM15N_WGS84, target_crs=WGS84):
+    """
+    Convert grid coordinates to geographic, scalars or whole arrays at once.
+
+    Returns:
+        tuple: (latitude, longitude)
+    """
+    longitude, latitude = get_transformer(source_crs, target_crs).transform(easting, northing)
+    return latitude, longitude
+
+
+def geographic_to_grid(latitude, longitude, target_crs=UTM15N_WGS84, source_crs=WGS84):
+    """
+    Convert geographic coordinates to grid, scalars or whole arrays at once.
+
+    Returns:
+        tuple: (easting, northing)
+    """
+    return get_transformer(source_crs, target_crs).transform(longitude, latitude)
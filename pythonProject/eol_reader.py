@@ -0,0 +1,353 @@
+import mmap
+import os
+from collections import namedtuple
+from collections.abc import Mapping
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from eol_schema import SHOT_DTYPE, apply_schema, apply_times, read_typed_csv
+from nav_cache import get_cache
+from nav_catalog import find_product_files
+
+EOL_ENCODING = 'ISO-8859-1'
+
+# title and column names of a section and the byte range of its data rows
+EOLSection = namedtuple('EOLSection', ['title', 'header', 'start', 'stop'])
+
+# parse cache entries of EOLReport, bump the version when the section output changes
+SECTION_CACHE_VERSION = 1
+INDEX_CACHE_NAME = f'{__name__}.index_sections:{SECTION_CACHE_VERSION}'
+SECTION_CACHE_NAME = f'{__name__}.parse_section:{SECTION_CACHE_VERSION}'
+
+
+def find_eol_reports(root_folder):
+    """EOL reports of production lines under root_folder, test and bble lines skipped, see NavCatalog."""
+    reports = []
+    for file_path in find_product_files(root_folder, 'EOL_Report'):
+        file = os.path.basename(file_path)
+        if file[0].isdigit() and not file.lower().startswith(('test', 'bble')):
+            reports.append(file_path)
+    return reports
+
+
+def read_bytes(file_path):
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+def _next_line(data, pos):
+    """Offset of the line after the one starting at pos."""
+    end = data.find(b'\n', pos)
+    return len(data) if end < 0 else end + 1
+
+
+def _is_blank(data, pos):
+    return data[pos:pos + 1] == b'\n' or data[pos:pos + 2] == b'\r\n'
+
+
+def _next_blank(data, pos, break_mark):
+    """Offset of the first blank line at or after pos, the end of the data if there is none."""
+    if _is_blank(data, pos):
+        return pos
+    found = data.find(break_mark, pos)
+    return len(data) if found < 0 else found + 1
+
+
+def _decode(data, start, stop):
+    return data[start:stop].decode(EOL_ENCODING).strip()
+
+
+def _unique_names(names):
+    """Make repeated column names unique the way pandas does, x, x.1, x.2."""
+    seen = {}
+    unique = []
+    for name in names:
+        if name in seen:
+            seen[name] += 1
+            unique.append(f'{name}.{seen[name]}')
+        else:
+            seen[name] = 0
+            unique.append(name)
+    return unique
+
+
+def index_sections(data):
+    """
+    Find every section of an EOL report in one scan of its bytes.
+
+    Only the few lines around each section break are looked at, the data rows
+    are skipped with a search for the next blank line.
+
+    A report starts with an EOL_Report line, then each section is a title
+    line, a blank line, the comma separated header, a blank line and the data
+    rows up to the next blank line.
+
+    Args:
+        data (bytes): whole report, see read_bytes
+
+    Returns:
+        list: EOLSection per section in file order
+    """
+    size = len(data)
+    sections = []
+    pos = _next_line(data, 0)
+    # a blank line follows a line end, CRLF files are known from their first line
+    break_mark = b'\n\r\n' if data[pos - 2:pos] == b'\r\n' else b'\n\n'
+    while pos < size:
+        # the line after a section's data, and anything repeated, may be blank
+        if _is_blank(data, pos):
+            pos = _next_line(data, pos)
+            continue
+        title_end = _next_line(data, pos)
+        title = _decode(data, pos, title_end)
+        header_start = _next_line(data, title_end)
+        if header_start >= size:
+            break
+        header_end = _next_line(data, header_start)
+        header = _unique_names(_decode(data, header_start, header_end).split(','))
+
+        # data runs to the next blank line, a blank first row means no data
+        start = min(_next_line(data, header_end), size)
+        stop = _next_blank(data, start, break_mark)
+        sections.append(EOLSection(title, header, start, stop))
+        pos = _next_line(data, stop) if stop < size else size
+    return sections
+
+
+def parse_section(data, section, parse_time=True):
+    """
+    Parse the data rows of one section with the pandas C parser.
+
+    Registered columns come back with their compact dtype, see eol_schema,
+    and Time as datetime when parse_time.
+    """
+    if section.stop <= section.start:
+        df = apply_schema(pd.DataFrame(columns=section.header))
+        return apply_times(df) if parse_time else df
+    return read_typed_csv(BytesIO(data[section.start:section.stop]), names=section.header, parse_time=parse_time,
+                          header=None, index_col=False, encoding=EOL_ENCODING, skip_blank_lines=True)
+
+
+def find_section(sections, marker):
+    """DataFrame of the first section whose title contains marker, None if there is none."""
+    for title in sections:
+        if marker in title:
+            return sections[title]
+    return None
+
+
+def section_columns(sections, marker, columns):
+    """
+    Pick columns of a section by position, e.g. {'Shot': 0, 'Time': 1, 'Crab_Angle': -1}.
+
+    Every column but Time is made numeric and rows where any of them is not a
+    number are dropped, Shot comes back as int32.
+
+    Returns:
+        DataFrame: the named columns, None when the section is missing, empty or too narrow
+    """
+    df = find_section(sections, marker)
+    if df is None or df.empty or df.shape[1] < max(i + 1 if i >= 0 else -i for i in columns.values()):
+        return None
+
+    picked = pd.DataFrame({name: df.iloc[:, i] for name, i in columns.items()})
+    numeric = [name for name in columns if name != 'Time']
+    for name in numeric:
+        picked[name] = pd.to_numeric(picked[name], errors='coerce')
+    picked = picked.dropna(subset=numeric).reset_index(drop=True)
+    if 'Shot' in picked.columns:
+        picked['Shot'] = picked['Shot'].astype(SHOT_DTYPE)
+    return picked if not picked.empty else None
+
+
+def _key_codes(frames, keys):
+    """Row of every section row in the combined table, shots repeated in a section paired in order."""
+    code = np.zeros(sum(len(df) for df in frames), dtype=np.int64)
+    uniques = []
+    for key in keys:
+        # sorted factorize keeps the order of the values in the codes, a missing key
+        # gets a code of its own like in pd.merge, last after the sorted values
+        key_codes, key_uniques = pd.factorize(pd.concat([df[key] for df in frames], ignore_index=True), sort=True,
+                                              use_na_sentinel=False)
+        code = code * max(len(key_uniques), 1) + key_codes
+        uniques.append(key_uniques)
+
+    bounds = np.cumsum([0] + [len(df) for df in frames])
+    repeat = np.zeros(len(code), dtype=np.int64)
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        section_code = code[start:stop]
+        # sections come in shot order, which proves them free of repeats cheaply
+        if not (np.diff(section_code) > 0).all() and not pd.Index(section_code).is_unique:
+            repeat[start:stop] = pd.Series(section_code).groupby(section_code).cumcount().to_numpy()
+    code = code * (repeat.max(initial=0) + 1) + repeat
+
+    row_codes, rows = pd.factorize(code)
+    order = np.argsort(rows, kind='stable')
+    row_of = np.empty(len(rows), dtype=np.int64)
+    row_of[order] = np.arange(len(rows))
+
+    # decode the key values of every combined row
+    remainder = rows[order] // (repeat.max(initial=0) + 1)
+    columns = {}
+    for key, key_uniques in zip(reversed(keys), reversed(uniques)):
+        columns[key] = key_uniques.take(remainder % max(len(key_uniques), 1))
+        remainder = remainder // max(len(key_uniques), 1)
+    key_table = pd.DataFrame({key: columns[key] for key in keys})
+    return key_table, [row_of[row_codes[start:stop]] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def combine_sections(sections, keys=('Shot #', 'Time'), fill_value=None):
+    """
+    Join sections side by side into one row per shot with a single aligned pass.
+
+    The keys of all sections are factorized together once and every column is
+    placed with one take, so the cost follows the size of the data rather than
+    growing with every section joined. Shots repeated within a section are
+    paired in order of appearance. A column name used by more than one section
+    is numbered in section order, x, x.1, x.2. Sections without the key
+    columns are left out.
+
+    Args:
+        sections (dict): title to DataFrame, e.g. from read_eol_sections or an EOLReport
+        keys (tuple): columns identifying a shot
+        fill_value: value for shots missing from a section, filled in the numeric
+            columns only, which then keep the dtype of their section. None leaves NaN
+
+    Returns:
+        DataFrame: keys then the remaining columns of every section, sorted by keys
+    """
+    keys = list(keys)
+    frames = [df for df in sections.values() if set(keys).issubset(df.columns)]
+    if not frames:
+        return pd.DataFrame(columns=keys)
+
+    combined, rows = _key_codes(frames, keys)
+    names = iter(_unique_names([name for df in frames for name in df.columns if name not in keys]))
+    columns = {}
+    for df, section_rows in zip(frames, rows):
+        # position in the section of every combined row, -1 where the shot is missing
+        take = np.full(len(combined), -1, dtype=np.int64)
+        take[section_rows] = np.arange(len(df))
+        for name in df.columns:
+            if name in keys:
+                continue
+            values = df[name].array
+            fill = fill_value if fill_value is not None and pd.api.types.is_numeric_dtype(values.dtype) else None
+            columns[next(names)] = pd.api.extensions.take(values, take, allow_fill=True, fill_value=fill)
+    return pd.concat([combined, pd.DataFrame(columns)], axis=1)
+
+
+def _map_file(file_path):
+    with open(file_path, 'rb') as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file cannot be mapped
+            return b''
+
+
+class EOLReport(Mapping):
+    """
+    EOL report opened for reading, with sections decoded on first access.
+
+    Opening the report indexes its sections, no data row is parsed. A section
+    is parsed when it is first looked up by title and kept for later lookups,
+    so a caller using two sections pays for two. Works as a read only dict of
+    title to DataFrame and as a context manager that releases the file.
+
+    The section index and every parsed section go through the parse cache,
+    see nav_cache, so a report already seen is not read again, the file is
+    only mapped when something is missing from the cache.
+    """
+
+    def __init__(self, file_path, parse_time=True):
+        """
+        Args:
+            file_path (str): Path to the EOL report
+            parse_time (bool): convert Time columns to datetime
+        """
+        self.file_path = file_path
+        self.parse_time = parse_time
+        self._data = None
+        self._index = {section.title: section for section in self._sections()}
+        self._parsed = {}
+
+    @property
+    def data(self):
+        """Bytes of the report, mapped on first use."""
+        if self._data is None:
+            self._data = _map_file(self.file_path)
+        return self._data
+
+    def _sections(self):
+        cache = get_cache()
+        index = cache.get(self.file_path, INDEX_CACHE_NAME)
+        if index is not None:
+            return [EOLSection(row.title, list(row.header), row.start, row.stop) for row in index.itertuples()]
+
+        sections = index_sections(self.data)
+        index = pd.DataFrame(sections, columns=EOLSection._fields)
+        cache.put(self.file_path, INDEX_CACHE_NAME, (), index)
+        return sections
+
+    @property
+    def titles(self):
+        """Section titles in file order."""
+        return list(self._index)
+
+    def __getitem__(self, title):
+        if title not in self._parsed:
+            cache = get_cache()
+            args = [title, self.parse_time]
+            df = cache.get(self.file_path, SECTION_CACHE_NAME, args)
+            if df is None:
+                df = parse_section(self.data, self._index[title], self.parse_time)
+                cache.put(self.file_path, SECTION_CACHE_NAME, args, df)
+            self._parsed[title] = df
+        return self._parsed[title]
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def section(self, marker):
+        """First section whose title contains marker, None if there is none, see find_section."""
+        return find_section(self, marker)
+
+    def close(self):
+        """Release the file, sections already decoded stay available."""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b''
+        self._index = {title: self._index[title] for title in self._parsed}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_eol_sections(file_path, titles=None, parse_time=True):
+    """
+    Read an EOL report into one DataFrame per section.
+
+    The file is indexed in one scan, then only the requested sections are
+    parsed, see EOLReport to parse them as they are used.
+
+    Args:
+        file_path (str): Path to the EOL report
+        titles (list): markers of the sections to parse, a section is parsed
+            when its title contains one of them, all sections when None
+        parse_time (bool): convert Time columns to datetime
+
+    Returns:
+        dict: Dictionary with section titles as keys containing pandas DataFrames
+    """
+    with EOLReport(file_path, parse_time) as report:
+        return {title: report[title] for title in report
+                if titles is None or any(marker in title for marker in titles)}
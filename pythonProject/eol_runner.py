@@ -0,0 +1,127 @@
+import os
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+from sqlalchemy.orm import sessionmaker
+
+from analyze_eol_report import EOLFile, init_database, process_eol_file
+from analyze_network_data import NetworkDataAnalyzer
+from analyze_vessel_data import VesselDataAnalyzer
+from eol_reader import EOLReport, find_eol_reports
+
+
+class DatabaseIngest:
+    """Analysis storing the network quality and shot point interval rows of a report, see process_eol_file"""
+
+    def __init__(self, database_url: str):
+        self.engine = init_database(database_url)
+        self.session = sessionmaker(bind=self.engine)()
+        # reports stored by an earlier run are skipped
+        self.existing_files = {filename for (filename,) in self.session.query(EOLFile.filename).all()}
+
+    def __call__(self, sections: EOLReport, line_name: str) -> None:
+        filename = os.path.basename(sections.file_path)
+        if filename in self.existing_files:
+            return
+        try:
+            process_eol_file(sections.file_path, self.engine, self.session, sections)
+        except Exception:
+            self.session.rollback()
+            raise
+        self.existing_files.add(filename)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class EOLRunner:
+    """
+    Walk the 00_NAV tree once and hand every EOL report to each registered analysis.
+
+    A report is opened once as an EOLReport and shared by all analyses, a
+    section is parsed the first time one of them looks it up, so adding an
+    analysis adds no file reads. An analysis is called as
+    analysis(sections, line_name) and what it returns is collected per line.
+    """
+
+    def __init__(self, root_folder: str, parse_time: bool = True):
+        self.root_folder = root_folder
+        self.parse_time = parse_time
+        self.analyses: Dict[str, Callable] = {}
+        self.results: Dict[str, Dict[str, object]] = {}
+        self.errors: List[Tuple[str, str, str]] = []
+
+    def register(self, name: str, analysis: Callable) -> 'EOLRunner':
+        """Add an analysis, called as analysis(sections, line_name) for every report"""
+        self.analyses[name] = analysis
+        return self
+
+    def process_file(self, file_path: str) -> Dict[str, object]:
+        """Run every analysis on one report, a failing analysis does not stop the others"""
+        line_name = os.path.basename(file_path).replace('-EOL_Report.csv', '')
+        results = {}
+        try:
+            with EOLReport(file_path, self.parse_time) as sections:
+                for name, analysis in self.analyses.items():
+                    try:
+                        results[name] = analysis(sections, line_name)
+                    except Exception as e:
+                        print(f"Error in {name} for {file_path}: {str(e)}")
+                        self.errors.append((file_path, name, str(e)))
+        except Exception as e:
+            print(f"Error processing file {file_path}: {str(e)}")
+            self.errors.append((file_path, None, str(e)))
+            return results
+
+        self.results[line_name] = results
+        print(f"Processed: {line_name}")
+        return results
+
+    def run(self) -> Dict[str, Dict[str, object]]:
+        """Process all EOL report files in the root folder"""
+        for file_path in find_eol_reports(self.root_folder):
+            self.process_file(file_path)
+
+        print("Processing complete!")
+        if self.errors:
+            print(f"{len(self.errors)} errors, see EOLRunner.errors")
+        return self.results
+
+    def summary(self, name: str) -> pd.DataFrame:
+        """Shots of every line returned by the named analysis, None results left out"""
+        frames = {line: results[name] for line, results in self.results.items()
+                  if isinstance(results.get(name), pd.DataFrame)}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, names=['Line', None]).reset_index(level='Line').reset_index(drop=True)
+
+
+def survey_runner(root_folder: str, output_folder: str, database_url: str = None) -> EOLRunner:
+    """Runner with the crab angle, gyro, network quality, shot interval and, given a database, ingest analyses"""
+    vessel = VesselDataAnalyzer(root_folder, os.path.join(output_folder, 'Vessel_Data_Analysis'))
+    network = NetworkDataAnalyzer(root_folder, os.path.join(output_folder, 'Network_Analysis'))
+
+    runner = EOLRunner(root_folder)
+    runner.register('crab_angle', vessel.process_crab_angle_data)
+    runner.register('gyro', vessel.process_gyro_data)
+    runner.register('network_quality', network.process_network_quality)
+    runner.register('shot_interval', network.process_shot_interval)
+    if database_url:
+        runner.register('db_ingest', DatabaseIngest(database_url))
+    return runner
+
+
+def main():
+    # Configure folders
+    output_folder = r'Y:\NAV\01_Projects\0_KMS_3D_OBN_MT3007424'
+    root_folder = r'Z:\MT3007424\Murphy_KMS_3D_OBN\00_NAV'
+    database_url = "sqlite:///eol_report.db"
+
+    # One pass over the tree for every analysis
+    runner = survey_runner(root_folder, output_folder, database_url)
+    runner.run()
+    runner.analyses['db_ingest'].close()
+
+
+if __name__ == "__main__":
+    main()
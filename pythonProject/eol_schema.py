@@ -0,0 +1,142 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+SHOT_DTYPE = 'int32'
+TIME_DTYPE = 'datetime64[ns]'
+MEASUREMENT_DTYPE = 'float32'
+POSITION_DTYPE = 'float64'
+TIME_FORMAT = '%d/%m/%Y %H:%M:%S'
+
+# columns of the EOL report, SMA QC, SourceDrift and AAT shot table known by name
+COLUMN_DTYPES = {
+    'Shot #': SHOT_DTYPE,
+    'Time': TIME_DTYPE,
+    'main DOF': MEASUREMENT_DTYPE,
+    'main Quality': MEASUREMENT_DTYPE,
+    'Shot Point Interval s': MEASUREMENT_DTYPE,
+}
+
+# the rest by pattern, first match wins. Positions keep float64, float32 only
+# resolves about 0.25 m at UTM northings
+COLUMN_PATTERNS = [
+    (re.compile(r'Easting|Northing|Latitude|Longitude'), POSITION_DTYPE),
+    (re.compile(r'^V[12]\w* '), MEASUREMENT_DTYPE),       # vessel, e.g. V1 SMA m, V1GY4 Obs °, V2WS1 Calc
+    (re.compile(r'^A[1-3]\w* '), MEASUREMENT_DTYPE),      # source arrays, e.g. A2 SP DDC m
+    (re.compile(r' (m|s|°|m/s|kn|Hz|%)$'), MEASUREMENT_DTYPE),
+]
+
+
+def column_dtype(name):
+    """Registered dtype of a column name, None when unknown and left to pandas."""
+    if name in COLUMN_DTYPES:
+        return COLUMN_DTYPES[name]
+    for pattern, dtype in COLUMN_PATTERNS:
+        if pattern.search(name):
+            return dtype
+    return None
+
+
+def schema_dtypes(names):
+    """read_csv dtype argument for the numeric registered columns among names."""
+    dtypes = {}
+    for name in names:
+        dtype = column_dtype(name)
+        if dtype is not None and dtype != TIME_DTYPE:
+            dtypes[name] = dtype
+    return dtypes
+
+
+def apply_schema(df):
+    """
+    Convert the registered numeric columns of an already parsed table.
+
+    Values that are not numbers become NaN, a shot column with gaps becomes
+    the nullable Int32. Time columns are converted by apply_times.
+    """
+    for name, dtype in schema_dtypes(df.columns).items():
+        values = pd.to_numeric(df[name], errors='coerce')
+        if dtype == SHOT_DTYPE and values.isna().any():
+            dtype = 'Int32'
+        df[name] = values.astype(dtype)
+    return df
+
+
+def _fixed_times(values):
+    """datetime64 of dd/mm/YYYY HH:MM:SS strings from their digits, None when any value has another layout."""
+    try:
+        raw = values.astype('S19')
+    except (UnicodeEncodeError, TypeError, ValueError):
+        return None
+    if not len(raw):
+        return None
+    chars = raw.view(np.uint8).reshape(len(raw), 19)
+    if not (chars[:, [2, 5, 10, 13, 16]] == np.frombuffer(b'// ::', dtype=np.uint8)).all():
+        return None
+    digits = chars[:, [0, 1, 3, 4, 6, 7, 8, 9, 11, 12, 14, 15, 17, 18]].astype(np.int64) - ord('0')
+    if not ((digits >= 0) & (digits <= 9)).all():
+        return None
+    day, month, century, year, hour, minute, second = (digits[:, 0::2] * 10 + digits[:, 1::2]).T
+    if not ((month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)).all():
+        return None
+
+    months = ((century * 100 + year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    days = months.astype('datetime64[D]') + (day - 1)
+    return days.astype('datetime64[ns]') + (hour * 3600 + minute * 60 + second).astype('timedelta64[s]')
+
+
+def parse_times(values):
+    """
+    Convert dd/mm/YYYY HH:MM:SS strings to datetime64 from their digits.
+
+    Anything not in exactly that layout, including blanks, goes through
+    pd.to_datetime and becomes NaT when it does not parse.
+    """
+    values = np.asarray(values, dtype=object)
+    times = _fixed_times(values)
+    if times is None:
+        times = pd.to_datetime(values, format=TIME_FORMAT, errors='coerce').to_numpy()
+    return times
+
+
+def apply_times(df):
+    """Convert the registered Time columns of a parsed table to datetime64, see parse_times."""
+    for name in df.columns:
+        if column_dtype(name) == TIME_DTYPE:
+            df[name] = parse_times(df[name])
+    return df
+
+
+def read_typed_csv(source, names=None, parse_time=True, **kwargs):
+    """
+    pd.read_csv with the registered dtypes applied while parsing.
+
+    When a column holds something that is not a number the C parser rejects
+    the dtype, the table is then read again untyped and converted with
+    apply_schema. Time columns are converted with parse_times when parse_time.
+
+    Args:
+        source: path or file object, a file object is read from its current position
+        names (list): column names, read from the header row when None
+        parse_time (bool): convert Time columns to datetime
+        **kwargs: passed on to pd.read_csv
+
+    Returns:
+        DataFrame
+    """
+    start = source.tell() if hasattr(source, 'seek') else None
+    if names is None:
+        header = pd.read_csv(source, nrows=0, **kwargs).columns
+        if start is not None:
+            source.seek(start)
+    else:
+        header = names
+        kwargs['names'] = names
+    try:
+        df = pd.read_csv(source, dtype=schema_dtypes(header), **kwargs)
+    except ValueError:
+        if start is not None:
+            source.seek(start)
+        df = apply_schema(pd.read_csv(source, **kwargs))
+    return apply_times(df) if parse_time else df
@@ -0,0 +1,168 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from preplot4d_to_df import get_4d_preplot_from_file
+
+
+class BaselineIndex:
+    """
+    KD-tree over the E/N of a 4D baseline preplot, kept in a sidecar file.
+
+    The tree is built once from get_4d_preplot_from_file and pickled next to
+    the preplot together with the line and shotpoint of every point, then
+    reloaded until the preplot changes. Queries take whole arrays of monitor
+    positions and run on all cores.
+    """
+
+    def __init__(self, preplot_path, index_path=None, leafsize=32):
+        self.preplot_path = preplot_path
+        self.index_path = index_path or preplot_path + '.kdtree'
+        self.leafsize = leafsize
+        self.tree = None
+        self.linename = None
+        self.shotpoint = None
+
+    def _source_stamp(self):
+        stat = os.stat(self.preplot_path)
+        return {'source_size': stat.st_size, 'source_mtime': stat.st_mtime}
+
+    def build(self):
+        """Build the tree from the preplot and write the sidecar index."""
+        df = get_4d_preplot_from_file(self.preplot_path)
+        points = np.column_stack([df['easting'].to_numpy(dtype=float), df['northing'].to_numpy(dtype=float)])
+        self.tree = cKDTree(points, leafsize=self.leafsize, balanced_tree=False)
+        self.linename = pd.Categorical(df['linename'])
+        self.shotpoint = df['shotpoint'].to_numpy()
+
+        index = self._source_stamp()
+        index.update(tree=self.tree, linename=self.linename, shotpoint=self.shotpoint)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.index_path)
+        return self
+
+    def load(self):
+        """Load the sidecar index, rebuilding it if the preplot has changed."""
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as f:
+                index = pickle.load(f)
+            stamp = self._source_stamp()
+            if (index['source_size'], index['source_mtime']) == (stamp['source_size'], stamp['source_mtime']):
+                self.tree = index['tree']
+                self.linename = index['linename']
+                self.shotpoint = index['shotpoint']
+                return self
+        return self.build()
+
+    def _points(self, easting, northing):
+        if self.tree is None:
+            self.load()
+        return np.column_stack([np.asarray(easting, dtype=float), np.asarray(northing, dtype=float)])
+
+    def baseline(self, index):
+        """Line, shotpoint and E/N of baseline points by position in the index, -1 gives a blank row."""
+        missing = index < 0
+        return pd.DataFrame({
+            'baseline_linename': self.linename.take(index, allow_fill=True),
+            'baseline_shotpoint': pd.arrays.IntegerArray(self.shotpoint[index], missing),
+            'baseline_east': np.where(missing, np.nan, self.tree.data[index, 0]),
+            'baseline_north': np.where(missing, np.nan, self.tree.data[index, 1]),
+        })
+
+    def nearest(self, easting, northing, max_distance=np.inf, workers=-1):
+        """
+        Nearest baseline point of every monitor position.
+
+        Args:
+            easting (array): monitor eastings
+            northing (array): monitor northings
+            max_distance (float): positions with no baseline point this close get NaN
+            workers (int): query threads, -1 uses every core
+
+        Returns:
+            DataFrame: baseline line, shotpoint, E/N and dS (distance) per monitor position
+        """
+        distance, index = self.tree.query(self._points(easting, northing), k=1,
+                                          distance_upper_bound=max_distance, workers=workers)
+        # unmatched positions come back with index n and an infinite distance
+        missing = ~np.isfinite(distance)
+        index[missing] = -1
+        df = self.baseline(index)
+        df['dS'] = np.where(missing, np.nan, distance)
+        return df
+
+    def within(self, easting, northing, radius):
+        """
+        Every baseline point within radius of every monitor position.
+
+        Returns:
+            DataFrame: monitor (row of the query arrays), baseline (row of the
+            index) and dS, ordered by monitor
+        """
+        points = self._points(easting, northing)
+        pairs = cKDTree(points, leafsize=self.leafsize).sparse_distance_matrix(self.tree, radius,
+                                                                                 output_type='ndarray')
+        pairs = np.sort(pairs, order=['i', 'j'])
+        return pd.DataFrame({'monitor': pairs['i'], 'baseline': pairs['j'], 'dS': pairs['v']})
+
+
+def delta_s(monitor_df, index, east='east', north='north', max_distance=np.inf):
+    """
+    Source position difference (dS) of every monitor shot to its nearest baseline shot.
+
+    Args:
+        monitor_df (DataFrame): monitor shots, e.g. from read_srecords
+        index (BaselineIndex): baseline preplot index
+        east (str): easting column of monitor_df
+        north (str): northing column of monitor_df
+        max_distance (float): shots further than this from any baseline shot get NaN
+
+    Returns:
+        DataFrame: monitor_df with the nearest baseline line, shotpoint, E/N and dS
+    """
+    nearest = index.nearest(monitor_df[east].to_numpy(), monitor_df[north].to_numpy(), max_distance)
+    return pd.concat([monitor_df.reset_index(drop=True), nearest], axis=1)
+
+
+def line_repeatability(delta_s_df, line='linename', limits=(5.0, 10.0)):
+    """
+    Per line dS summary.
+
+    Args:
+        delta_s_df (DataFrame): output of delta_s
+        line (str): column to group monitor shots by
+        limits (tuple): adds the fraction of shots with dS within each limit
+
+    Returns:
+        DataFrame: shots, mean, median, P95 and max dS per line
+    """
+    ds = delta_s_df['dS']
+    lines = ds.groupby(delta_s_df[line], observed=True)
+
+    summary = pd.DataFrame({
+        'shots': lines.size(),
+        'dS_mean': lines.mean(),
+        'dS_median': lines.median(),
+        'dS_p95': lines.quantile(0.95),
+        'dS_max': lines.max(),
+    })
+    for limit in limits:
+        summary[f'within_{limit:g}m'] = (ds <= limit).groupby(delta_s_df[line], observed=True).mean()
+    return summary.reset_index()
+
+
+if __name__ == '__main__':
+
+    from p190_reader import read_srecords
+
+    baseline = r"Y:\NAV\01_Projects\0_KMS_3D_OBN_MT3007424\Preplots\KMS4D2024_NAD27_UTM15N_v2-1_Orca\KMS4D2024_NAD27_UTM15N_v2-1_Orca.190"
+    monitor = r"Y:\NAV\01_Projects\0_KMS_3D_OBN_MT3007424\Processed\KMS4D_Monitor.p190"
+
+    index = BaselineIndex(baseline).load()
+    shots = delta_s(read_srecords(monitor), index)
+    print(line_repeatability(shots))
@@ -0,0 +1,214 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:  # the cache is bypassed without a parquet engine
+    pyarrow = None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.nav_parse_cache')
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+
+
+class ParseCache:
+    """
+    Local cache of parsed navigation tables stored as parquet.
+
+    Entries are keyed by the absolute source path and the parser that produced
+    them, and are reused while the source file's size and mtime are unchanged.
+    With verify_content a changed mtime falls back to a content hash, so a
+    file copied again from the share does not force a re-parse. The cache is
+    kept under max_bytes by evicting the least recently used entries.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, verify_content=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.verify_content = verify_content
+        self.enabled = pyarrow is not None
+        # bytes of parquet in the cache, counted once and then kept up to date by put
+        self._size = None
+
+    def _key(self, file_path, parser_name, args):
+        raw = json.dumps([os.path.abspath(file_path), parser_name, args], default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.parquet', base + '.json'
+
+    @staticmethod
+    def content_hash(file_path, chunk_size=4 * 1024 * 1024):
+        digest = hashlib.blake2b(digest_size=20)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _is_fresh(self, meta, stat, file_path, meta_path):
+        if meta['size'] != stat.st_size:
+            return False
+        if meta['mtime'] == stat.st_mtime:
+            return True
+        if self.verify_content and meta.get('hash') == self.content_hash(file_path):
+            meta['mtime'] = stat.st_mtime
+            self._write_json(meta_path, meta)
+            return True
+        return False
+
+    def get(self, file_path, parser_name, args=()):
+        """Cached table for the file, or None when missing or stale."""
+        if not self.enabled:
+            return None
+        data_path, meta_path = self._paths(self._key(file_path, parser_name, args))
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            if not self._is_fresh(meta, os.stat(file_path), file_path, meta_path):
+                return None
+            df = pd.read_parquet(data_path)
+            # touch the entry so eviction sees it as recently used, another process
+            # sharing the cache may have evicted it since it was read
+            os.utime(data_path)
+        except (OSError, ValueError, KeyError, pyarrow.ArrowException):
+            return None
+        return df
+
+    def put(self, file_path, parser_name, args, df):
+        """
+        Store a parsed table, silently skipping tables parquet cannot hold.
+
+        A cache that cannot be written, a full disk or a directory that cannot
+        be created, never fails the parse, the table is then just not kept.
+        """
+        if not self.enabled:
+            return
+        try:
+            self._store(file_path, parser_name, args, df)
+        except OSError:
+            return
+
+    def _store(self, file_path, parser_name, args, df):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        stat = os.stat(file_path)
+        data_path, meta_path = self._paths(self._key(file_path, parser_name, args))
+        meta = {'source': os.path.abspath(file_path), 'parser': parser_name,
+                'size': stat.st_size, 'mtime': stat.st_mtime}
+        if self.verify_content:
+            meta['hash'] = self.content_hash(file_path)
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self.entries())
+        replaced = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            df.to_parquet(tmp_path, index=True)
+            os.replace(tmp_path, data_path)
+        except (ValueError, TypeError, pyarrow.ArrowException):
+            return
+        finally:
+            # only left when the write failed, whatever the error
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._write_json(meta_path, meta)
+
+        # the directory is only listed again once the cache outgrows max_bytes. Other
+        # processes writing to it are not counted, the next eviction corrects for them
+        self._size += os.path.getsize(data_path) - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+
+    @staticmethod
+    def _write_json(path, meta):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    def load(self, file_path, parser, *args, **kwargs):
+        """Return parser(file_path, *args, **kwargs), from the cache when fresh."""
+        parser_name = f'{parser.__module__}.{parser.__qualname__}:{getattr(parser, "cache_version", 0)}'
+        key_args = [args, sorted(kwargs.items())]
+        df = self.get(file_path, parser_name, key_args)
+        if df is None:
+            df = parser(file_path, *args, **kwargs)
+            self.put(file_path, parser_name, key_args, df)
+        return df
+
+    def entries(self):
+        """Parquet entries in the cache as (path, size, last used) tuples."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.parquet'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        # evicted by another process sharing the cache
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for data_path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            for path in (data_path, data_path[:-len('.parquet')] + '.json'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+        self._size = total
+
+    def clear(self):
+        self.max_bytes, max_bytes = 0, self.max_bytes
+        self.evict()
+        self.max_bytes = max_bytes
+
+
+_cache = ParseCache(
+    cache_dir=os.environ.get('NAV_PARSE_CACHE_DIR', DEFAULT_CACHE_DIR),
+    max_bytes=int(os.environ.get('NAV_PARSE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)),
+)
+
+
+def get_cache():
+    return _cache
+
+
+def set_cache(cache):
+    """Replace the process wide cache, a cache with enabled = False turns caching off."""
+    global _cache
+    _cache = cache
+
+
+def cached_parse(version=0):
+    """
+    Decorator for parsers taking the source file path as first argument.
+
+    Bump version when the parser output changes so old entries are not reused.
+    The undecorated parser stays available as .uncached.
+    """
+    def decorator(parser):
+        parser.cache_version = version
+
+        @functools.wraps(parser)
+        def wrapper(file_path, *args, **kwargs):
+            return get_cache().load(file_path, parser, *args, **kwargs)
+
+        wrapper.uncached = parser
+        return wrapper
+    return decorator
@@ -0,0 +1,158 @@
+import hashlib
+import os
+import pickle
+import re
+
+import pandas as pd
+
+from nav_cache import get_cache
+
+# product files of a sequence by file name ending
+PRODUCT_SUFFIXES = {
+    'EOL_Report': '-EOL_Report.csv',
+    'SMA_QC': '-SMA_QC.csv',
+    'SourceDrift': '-SourceDrift.csv',
+    'AAT_Shot_Table': '-AAT_Shot_Table.csv',
+}
+
+CATALOG_COLUMNS = ['product', 'sequence', 'line', 'folder', 'path', 'mtime', 'size']
+
+SEQUENCE_FOLDER = re.compile(r'^Seq(\d+)$')
+
+
+def _product(name):
+    for product, suffix in PRODUCT_SUFFIXES.items():
+        if name.endswith(suffix):
+            return product, name[:-len(suffix)]
+    return None, None
+
+
+class NavCatalog:
+    """
+    Catalog of the sequence product files under a 00_NAV tree, kept between runs.
+
+    The tree is scanned with os.scandir and every product file is recorded
+    with its sequence, line name, size and mtime. The catalog is saved with
+    the mtime of every directory, a later scan lists again only directories
+    whose mtime changed and costs one stat for each of the others. A file
+    rewritten in place does not change its directory, its recorded mtime and
+    size are then those of the last listing.
+    """
+
+    def __init__(self, root_folder, catalog_path=None):
+        self.root_folder = root_folder
+        if catalog_path is None:
+            key = hashlib.sha1(os.path.abspath(root_folder).encode()).hexdigest()[:16]
+            catalog_path = os.path.join(get_cache().cache_dir, f'catalog_{key}.pkl')
+        self.catalog_path = catalog_path
+        self._dirs = None
+
+    def load(self):
+        """Directories of the saved catalog, empty when there is none."""
+        try:
+            with open(self.catalog_path, 'rb') as f:
+                catalog = pickle.load(f)
+            self._dirs = catalog['dirs'] if catalog['root'] == os.path.abspath(self.root_folder) else {}
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+            self._dirs = {}
+        return self
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.catalog_path) or '.', exist_ok=True)
+        tmp_path = self.catalog_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'root': os.path.abspath(self.root_folder), 'dirs': self._dirs}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.catalog_path)
+
+    def _list(self, path, folder, sequence):
+        subdirs = {}
+        files = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir():
+                    # on Windows the listing already holds the stat of every entry
+                    subdirs[entry.name] = entry.stat().st_mtime
+                    continue
+                product, line = _product(entry.name)
+                if product is not None:
+                    stat = entry.stat()
+                    files.append((product, sequence, line, folder, entry.path, stat.st_mtime, stat.st_size))
+        return subdirs, files
+
+    @staticmethod
+    def _stat_subdirs(path, names):
+        subdirs = {}
+        for name in names:
+            try:
+                subdirs[name] = os.stat(os.path.join(path, name)).st_mtime
+            except FileNotFoundError:
+                # removed or renamed since the last scan, its records are dropped
+                continue
+        return subdirs
+
+    def _visit(self, path, folder, sequence, mtime, dirs):
+        stored = self._dirs.get(folder)
+        if stored is not None and stored['mtime'] == mtime:
+            subdirs = self._stat_subdirs(path, stored['subdirs'])
+            files = stored['files']
+        else:
+            subdirs, files = self._list(path, folder, sequence)
+        dirs[folder] = {'mtime': mtime, 'subdirs': sorted(subdirs), 'files': files}
+
+        for name, sub_mtime in subdirs.items():
+            sub_sequence = sequence
+            if sequence is None:
+                match = SEQUENCE_FOLDER.match(name)
+                sub_sequence = int(match.group(1)) if match else None
+            try:
+                self._visit(os.path.join(path, name), os.path.join(folder, name), sub_sequence, sub_mtime, dirs)
+            except FileNotFoundError:
+                # removed since it was listed
+                dirs.pop(os.path.join(folder, name), None)
+                dirs[folder]['subdirs'].remove(name)
+
+    def scan(self):
+        """Bring the catalog up to date with the tree and save it."""
+        if self._dirs is None:
+            self.load()
+        dirs = {}
+        self._visit(self.root_folder, '', None, os.stat(self.root_folder).st_mtime, dirs)
+        # an unchanged tree is not written again, so polling it stays read only
+        if dirs != self._dirs:
+            self._dirs = dirs
+            self.save()
+        return self
+
+    def files(self, product=None, sequences=None, subfolder=None):
+        """
+        Product files in the catalog, scanned first if needed.
+
+        Args:
+            product (str): one of PRODUCT_SUFFIXES, every product when None
+            sequences (iterable): sequence numbers to keep, e.g. range(1001, 1080)
+            subfolder (str): keep files below this folder of their sequence folder, e.g. PP_SP_Range
+
+        Returns:
+            DataFrame: CATALOG_COLUMNS, one row per file sorted by path
+        """
+        if self._dirs is None:
+            self.scan()
+        df = pd.DataFrame([record for d in self._dirs.values() for record in d['files']], columns=CATALOG_COLUMNS)
+        if product is not None:
+            df = df[df['product'] == product]
+        if sequences is not None:
+            df = df[df['sequence'].isin(list(sequences))]
+        if subfolder is not None:
+            parts = df['folder'].str.split(re.escape(os.sep), regex=True)
+            df = df[parts.str[1] == subfolder]
+        return df.sort_values('path').reset_index(drop=True)
+
+    def paths(self, product=None, sequences=None, subfolder=None):
+        """Paths of the product files, see files."""
+        return self.files(product, sequences, subfolder)['path'].tolist()
+
+
+def find_product_files(root_folder, product, sequences=None, subfolder=None):
+    """Paths of one product under root_folder from the saved catalog, brought up to date first."""
+    return NavCatalog(root_folder).scan().paths(product, sequences, subfolder)
@@ -0,0 +1,171 @@
+import json
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+
+from p190_reader import (CHUNK_SIZE, RECORD_LENGTH, S_RECORD_FIELDS, as_buffer, decode_s_records,
+                         iter_buffers, parse_integers, record_block, record_starts)
+
+INDEX_COLUMNS = ['linename', 'start', 'stop', 'first_sp', 'last_sp', 'records']
+
+
+class P190Index:
+    """
+    Sidecar byte-offset index of the line blocks in a P1/90 file.
+
+    One scan records, for every contiguous run of S records of the same line,
+    the byte range of the run and its first and last SP. Queries then map the
+    file and decode only the records of the requested line and SP range.
+
+    Other S record layouts are indexed by passing their fields, the name of
+    their SP field and their decoder, e.g. for the KMS 4D preplot
+    P190Index(path, fields=FOURD_PREPLOT_FIELDS, decoder=decode_4d_records, sp_field='shotpoint').
+    """
+
+    def __init__(self, file_path, index_path=None, fields=None, decoder=decode_s_records, sp_field='sp'):
+        """
+        Args:
+            file_path (str): Path to the P1/90 file
+            index_path (str): sidecar file, <file_path>.idx by default
+            fields (dict): (start, stop) columns of the layout, with linename and sp_field
+            decoder: function turning an (n, 80) S record block into a DataFrame
+            sp_field (str): key of the shot point in fields
+        """
+        self.file_path = file_path
+        self.index_path = index_path or file_path + '.idx'
+        self.fields = fields or S_RECORD_FIELDS
+        self.decoder = decoder
+        self.sp_field = sp_field
+        self.blocks = None
+        self._file = None
+        self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+            self._file = None
+
+    def _source_stamp(self):
+        stat = os.stat(self.file_path)
+        return {'source_size': stat.st_size, 'source_mtime': stat.st_mtime}
+
+    def build(self, chunk_size=CHUNK_SIZE):
+        """Scan the file once and write the sidecar index."""
+        name_start, name_stop = self.fields['linename']
+        sp_start, sp_stop = self.fields[self.sp_field]
+
+        runs = []
+        with open(self.file_path, 'rb') as f:
+            for offset, buf in iter_buffers(f, chunk_size):
+                starts = record_starts(buf, b'S')
+                if len(starts) == 0:
+                    continue
+                records = record_block(buf, starts)
+                names = records[:, name_start:name_stop]
+                sps = parse_integers(records[:, sp_start:sp_stop])
+
+                change = np.ones(len(starts), dtype=bool)
+                change[1:] = (names[1:] != names[:-1]).any(axis=1)
+                firsts = np.flatnonzero(change)
+                lasts = np.append(firsts[1:] - 1, len(starts) - 1)
+
+                for i, j in zip(firsts, lasts):
+                    name = names[i].tobytes().decode('ascii', 'replace').strip()
+                    run = [name, int(offset + starts[i]), int(offset + starts[j] + RECORD_LENGTH),
+                           int(sps[i]), int(sps[j]), int(j - i + 1)]
+                    # a line block cut by the chunk boundary continues the previous run
+                    if i == 0 and runs and runs[-1][0] == name:
+                        runs[-1][2] = run[2]
+                        runs[-1][4] = run[4]
+                        runs[-1][5] += run[5]
+                    else:
+                        runs.append(run)
+
+        self.blocks = pd.DataFrame(runs, columns=INDEX_COLUMNS)
+        index = self._source_stamp()
+        index['blocks'] = runs
+        with open(self.index_path, 'w') as f:
+            json.dump(index, f)
+        return self.blocks
+
+    def load(self):
+        """Load the sidecar index, rebuilding it if the source file has changed."""
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            stamp = self._source_stamp()
+            if (index['source_size'], index['source_mtime']) == (stamp['source_size'], stamp['source_mtime']):
+                self.blocks = pd.DataFrame(index['blocks'], columns=INDEX_COLUMNS)
+                return self.blocks
+        return self.build()
+
+    def lines(self):
+        """Summary of first/last SP per line name."""
+        if self.blocks is None:
+            self.load()
+        return self.blocks.groupby('linename').agg(first_sp=('first_sp', 'first'), last_sp=('last_sp', 'last'),
+                                                   records=('records', 'sum'))
+
+    def _mapped(self):
+        if self._map is None:
+            self._file = open(self.file_path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def query(self, linename, sp_min=None, sp_max=None):
+        """
+        Decode the S records of one line, optionally limited to an SP range.
+
+        Args:
+            linename (str): line name as it appears in the file
+            sp_min (int): first SP to return, inclusive
+            sp_max (int): last SP to return, inclusive
+
+        Returns:
+            DataFrame: decoded records in file order
+        """
+        if self.blocks is None:
+            self.load()
+
+        blocks = self.blocks[self.blocks['linename'] == linename]
+        lo = -np.inf if sp_min is None else sp_min
+        hi = np.inf if sp_max is None else sp_max
+        block_lo = blocks[['first_sp', 'last_sp']].min(axis=1)
+        block_hi = blocks[['first_sp', 'last_sp']].max(axis=1)
+        blocks = blocks[(block_hi >= lo) & (block_lo <= hi)]
+
+        mapped = self._mapped()
+        sp_start, sp_stop = self.fields[self.sp_field]
+        frames = []
+        for start, stop in zip(blocks['start'], blocks['stop']):
+            buf = as_buffer(mapped[start:stop])
+            records = record_block(buf, record_starts(buf, b'S'))
+            sps = parse_integers(records[:, sp_start:sp_stop])
+            frames.append(self.decoder(records[(sps >= lo) & (sps <= hi)]))
+
+        if not frames:
+            return self.decoder(np.empty((0, RECORD_LENGTH), dtype=np.uint8))
+        return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == '__main__':
+
+    import sys
+
+    p190_file = sys.argv[1]
+
+    with P190Index(p190_file) as index:
+        index.load()
+        print(index.lines())
+        if len(sys.argv) > 2:
+            print(index.query(sys.argv[2], int(sys.argv[3]), int(sys.argv[4])))
@@ -0,0 +1,587 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from nav_cache import cached_parse
+
+# UKOOA P1/90 S record columns (python slice positions) as used by the BOEM and
+# Orca exports. Lat/long are DDMMSS.ssH / DDDMMSS.ssH, depth is positive down.
+S_RECORD_FIELDS = {
+    'linename': (1, 11),
+    'sp': (20, 25),
+    'lat': (25, 35),
+    'long': (35, 46),
+    'east': (47, 55),
+    'north': (55, 64),
+    'depth': (64, 70),
+    'jday': (70, 73),
+    'time': (73, 79),
+}
+
+# preplot V records share the type 1 layout, their line names can use the full 12 characters
+V_RECORD_FIELDS = {
+    'linename': (1, 13),
+    'sp': (20, 25),
+    'lat': (25, 35),
+    'long': (35, 46),
+    'east': (47, 55),
+    'north': (55, 64),
+}
+
+# the full P1/90 line name field, used to find where one line block ends
+LINE_NAME_COLUMNS = (1, 13)
+
+# vessel/source/other identifiers of a type 1 record, these tell the Z records of one shot apart
+POSITION_ID_FIELDS = {
+    'vessel_id': 16,
+    'source_id': 17,
+    'other_id': 18,
+}
+
+# H records carry a 4 character id, a description and a free text value
+H_RECORD_FIELDS = {
+    'record_id': (1, 5),
+    'description': (5, 32),
+    'value': (32, 80),
+}
+
+# R records hold three receiver groups of group number, E, N and depth, then the streamer id
+R_GROUP_FIELDS = {
+    'group': (0, 4),
+    'east': (4, 13),
+    'north': (13, 22),
+    'depth': (22, 26),
+}
+R_GROUP_WIDTH = 26
+R_GROUPS_PER_RECORD = 3
+R_STREAMER_COLUMN = 79
+
+RECORD_LENGTH = 80
+
+# bytes read per chunk by the streaming readers, small enough to stay in cache
+CHUNK_SIZE = 4 * 1024 * 1024
+
+_POW10 = 10 ** np.arange(19, dtype=np.int64)
+
+
+def load_buffer(file_path):
+    """Read a whole navigation file as a uint8 array padded by one record."""
+    size = os.path.getsize(file_path)
+    buf = np.empty(size + RECORD_LENGTH, dtype=np.uint8)
+    buf[size:] = ord(' ')
+    with open(file_path, 'rb') as f:
+        f.readinto(memoryview(buf)[:size])
+    return buf
+
+
+def as_buffer(data):
+    """Wrap raw bytes as a uint8 array padded so fixed columns never overrun."""
+    return np.frombuffer(data + b' ' * RECORD_LENGTH, dtype=np.uint8)
+
+
+def iter_buffers(f, chunk_size=CHUNK_SIZE, follow=False, poll_interval=1.0):
+    """
+    Read an open binary file in chunks that always end on a whole line.
+
+    Args:
+        f: file object opened in binary mode, read from its current position
+        chunk_size (int): approximate number of bytes per chunk
+        follow (bool): keep waiting for data appended to the file instead of
+            stopping at the end, a trailing partial line is held back until
+            its newline has been written
+        poll_interval (float): seconds between reads at the end of a followed file
+
+    Yields:
+        tuple: (file offset of the chunk, padded uint8 buffer from as_buffer)
+    """
+    offset = f.tell()
+    carry = b''
+    while True:
+        data = f.read(chunk_size)
+        if not data:
+            if follow:
+                time.sleep(poll_interval)
+                continue
+            break
+        data = carry + data
+        cut = data.rfind(b'\n') + 1
+        if cut == 0:
+            carry = data
+            continue
+        yield offset, as_buffer(data[:cut])
+        offset += cut
+        carry = data[cut:]
+    if carry:
+        yield offset, as_buffer(carry)
+
+
+def record_starts(buf, record_type=b'S'):
+    """
+    Byte offsets of every record of the given type.
+
+    Args:
+        buf (np.ndarray): uint8 buffer from load_buffer/as_buffer
+        record_type (bytes): single character record identifier, None for every line
+
+    Returns:
+        np.ndarray: int64 offsets of the first character of each matching record
+    """
+    size = len(buf) - RECORD_LENGTH
+    starts = _fixed_line_starts(buf, size)
+    if starts is None:
+        newlines = np.flatnonzero(buf[:size] == ord('\n'))
+        starts = np.concatenate(([0], newlines + 1))
+        # drop the empty line after the final newline
+        starts = starts[starts < size]
+    if record_type is None:
+        return starts
+    return starts[buf[starts] == ord(record_type)]
+
+
+def _fixed_line_starts(buf, size):
+    """Line offsets without a newline scan when every line has the same length."""
+    first = np.flatnonzero(buf[:RECORD_LENGTH + 2] == ord('\n'))
+    if len(first) == 0:
+        return None
+    line_length = first[0] + 1
+    if size % line_length or not (buf[line_length - 1:size:line_length] == ord('\n')).all():
+        return None
+    return np.arange(0, size, line_length)
+
+
+def record_block(buf, starts, width=RECORD_LENGTH):
+    """Copy the records at the given offsets into an (n, width) uint8 array."""
+    return sliding_window_view(buf, width)[starts]
+
+
+def byte_columns(records, rows_per_block=16384):
+    """
+    Transpose an (n, width) record block to (width, n) so each byte column is contiguous.
+
+    Done in row blocks that stay in cache, a single numpy transpose of a large
+    uint8 array is several times slower.
+    """
+    columns = np.empty(records.shape[::-1], dtype=np.uint8)
+    for i in range(0, len(records), rows_per_block):
+        columns[:, i:i + rows_per_block] = records[i:i + rows_per_block].T
+    return columns
+
+
+def _scan_digits(block):
+    """Horner scan of a fixed-width column, one byte column at a time."""
+    n, width = block.shape
+    # nine digits always fit in int32, which halves the memory traffic of the scan
+    dtype = np.int32 if width <= 9 else np.int64
+    mantissa = np.zeros(n, dtype=dtype)
+    decimals = np.zeros(n, dtype=np.int8)
+    seen_dot = np.zeros(n, dtype=bool)
+    negative = np.zeros(n, dtype=bool)
+    any_digit = np.zeros(n, dtype=bool)
+    shifted = np.empty(n, dtype=dtype)
+    for column in np.ascontiguousarray(block.T):
+        digit = column - np.uint8(ord('0'))
+        is_digit = digit < 10
+        # spaces, signs and the decimal point leave the mantissa untouched
+        np.multiply(mantissa, 10, out=shifted)
+        np.add(shifted, digit, out=mantissa, where=is_digit)
+        decimals += is_digit & seen_dot
+        seen_dot |= column == ord('.')
+        negative |= column == ord('-')
+        any_digit |= is_digit
+    np.negative(mantissa, out=mantissa, where=negative)
+    return mantissa, decimals, any_digit
+
+
+def parse_numbers(block):
+    """
+    Parse a fixed-width numeric column straight from its bytes.
+
+    Args:
+        block (np.ndarray): (n, width) uint8 array, one right-justified number per row
+
+    Returns:
+        np.ndarray: float64 values, blank fields become NaN
+    """
+    mantissa, decimals, any_digit = _scan_digits(block)
+    values = mantissa / _POW10[decimals]
+    return np.where(any_digit, values, np.nan)
+
+
+def parse_integers(block, dtype=np.int32):
+    """Parse a fixed-width integer column straight from its bytes."""
+    mantissa, _, _ = _scan_digits(block)
+    return mantissa.astype(dtype)
+
+
+def dms_to_decimal(block, deg_width):
+    """
+    Convert DDMMSS.ssH (or DDDMMSS.ssH) columns to signed decimal degrees.
+
+    Args:
+        block (np.ndarray): (n, width) uint8 array holding the packed DMS values
+        deg_width (int): 2 for latitude, 3 for longitude
+
+    Returns:
+        np.ndarray: float64 decimal degrees, negative for S and W
+    """
+    deg = parse_numbers(block[:, :deg_width])
+    mins = parse_numbers(block[:, deg_width:deg_width + 2])
+    secs = parse_numbers(block[:, deg_width + 2:-1])
+    hemisphere = block[:, -1]
+
+    decimal = deg + mins / 60 + secs / 3600
+    negative = (hemisphere == ord('S')) | (hemisphere == ord('W'))
+    return np.where(negative, -decimal, decimal)
+
+
+def hhmmss_to_timedelta(block):
+    """Convert HHMMSS columns to a time-of-day timedelta64 column."""
+    hms = parse_integers(block)
+    seconds = hms // 10000 * 3600 + hms // 100 % 100 * 60 + hms % 100
+    return pd.to_timedelta(seconds, unit='s')
+
+
+def names_to_categorical(block):
+    """
+    Turn a fixed-width name column into a Categorical.
+
+    Records of one line are contiguous, so only the first record of every run
+    is decoded to a python string.
+    """
+    n = len(block)
+    change = np.ones(n, dtype=bool)
+    if n > 1:
+        change[1:] = (block[1:] != block[:-1]).any(axis=1)
+    firsts = np.flatnonzero(change)
+    run_names = [block[i].tobytes().decode('ascii', 'replace').strip() for i in firsts]
+    categories, run_codes = np.unique(np.array(run_names, dtype=object), return_inverse=True)
+    codes = run_codes.ravel()[np.cumsum(change) - 1]
+    return pd.Categorical.from_codes(codes, categories.astype(str))
+
+
+def decode_s_records(records):
+    """
+    Decode a block of S records into a typed DataFrame.
+
+    Args:
+        records (np.ndarray): (n, 80) uint8 array from record_block
+
+    Returns:
+        DataFrame: linename (category), sp (int32), lat/long (float64 decimal
+        degrees), east/north (float64), depth (float64, negative down),
+        jday (int16), time (timedelta64 time of day)
+    """
+    columns = byte_columns(records)
+
+    def field(name):
+        start, stop = S_RECORD_FIELDS[name]
+        return columns[start:stop].T
+
+    return pd.DataFrame({
+        'linename': names_to_categorical(field('linename')),
+        'sp': parse_integers(field('sp')),
+        'lat': dms_to_decimal(field('lat'), 2),
+        'long': dms_to_decimal(field('long'), 3),
+        'east': parse_numbers(field('east')),
+        'north': parse_numbers(field('north')),
+        'depth': -parse_numbers(field('depth')),
+        'jday': parse_integers(field('jday'), np.int16),
+        'time': hhmmss_to_timedelta(field('time')),
+    })
+
+
+def decode_v_records(records):
+    """
+    Decode preplot V records into a typed DataFrame.
+
+    Returns:
+        DataFrame: linename (category), sp (int32), lat/long (float64 decimal
+        degrees) and east/north (float64)
+    """
+    def field(name):
+        start, stop = V_RECORD_FIELDS[name]
+        return columns[start:stop].T
+
+    columns = byte_columns(records)
+    return pd.DataFrame({
+        'linename': names_to_categorical(field('linename')),
+        'sp': parse_integers(field('sp')),
+        'lat': dms_to_decimal(field('lat'), 2),
+        'long': dms_to_decimal(field('long'), 3),
+        'east': parse_numbers(field('east')),
+        'north': parse_numbers(field('north')),
+    })
+
+
+def decode_position_records(records):
+    """Decode type 1 (S, V, Z, ...) records with their vessel/source/other identifiers."""
+    df = decode_s_records(records)
+    for name, column in POSITION_ID_FIELDS.items():
+        ids = records[:, column:column + 1].copy().view('S1').ravel()
+        df[name] = pd.Categorical(np.char.decode(ids, 'ascii'))
+    return df
+
+
+def decode_h_records(records):
+    """Decode H records into record_id, description and value strings."""
+    table = {}
+    for name, (start, stop) in H_RECORD_FIELDS.items():
+        field = np.ascontiguousarray(records[:, start:stop]).view(f'S{stop - start}').ravel()
+        table[name] = np.char.strip(np.char.decode(field, 'ascii', 'replace'))
+    return pd.DataFrame(table)
+
+
+def decode_r_records(records):
+    """
+    Decode R records into one row per receiver group.
+
+    Args:
+        records (np.ndarray): (n, 80) uint8 array of R records
+
+    Returns:
+        DataFrame: group (int32), east/north (float64), depth (float32),
+        streamer (category) and record, the position of the R record in records
+    """
+    n = len(records)
+    width = R_GROUP_WIDTH * R_GROUPS_PER_RECORD
+    groups = np.ascontiguousarray(records[:, 1:1 + width]).reshape(n * R_GROUPS_PER_RECORD, R_GROUP_WIDTH)
+    columns = byte_columns(groups)
+
+    def field(name):
+        start, stop = R_GROUP_FIELDS[name]
+        return columns[start:stop].T
+
+    streamer = records[:, R_STREAMER_COLUMN:R_STREAMER_COLUMN + 1].copy().view('S1').ravel()
+    df = pd.DataFrame({
+        'group': parse_integers(field('group')),
+        'east': parse_numbers(field('east')),
+        'north': parse_numbers(field('north')),
+        'depth': parse_numbers(field('depth')).astype(np.float32),
+        'streamer': pd.Categorical(np.char.decode(np.repeat(streamer, R_GROUPS_PER_RECORD), 'ascii')),
+        'record': np.repeat(np.arange(n), R_GROUPS_PER_RECORD),
+    })
+    # unused group slots at the end of the last record of a spread are blank
+    return df[~np.isnan(df['east'].to_numpy())].reset_index(drop=True)
+
+
+@cached_parse(version=1)
+def read_srecords(file_path):
+    """
+    Read every S record of a P1/90 file into a typed DataFrame.
+
+    The file is read once as bytes and each fixed column is decoded for all
+    records at once, no per-line python objects are created. Results are kept
+    in the parse cache until the file changes.
+
+    Args:
+        file_path (str): Path to the P1/90 file
+
+    Returns:
+        DataFrame: see decode_s_records
+    """
+    buf = load_buffer(file_path)
+    return decode_s_records(record_block(buf, record_starts(buf, b'S')))
+
+
+def iter_chunks(file_path, chunk_size=CHUNK_SIZE, record_type=b'S', decoder=decode_s_records):
+    """
+    Stream a P1/90 file and yield the decoded records of each chunk.
+
+    Cheaper than iter_lines when the caller only reduces every chunk, a line
+    block can be split over two chunks.
+
+    Yields:
+        DataFrame: records of one chunk, see decode_s_records
+    """
+    with open(file_path, 'rb') as f:
+        for _, buf in iter_buffers(f, chunk_size):
+            starts = record_starts(buf, record_type)
+            if len(starts):
+                yield decoder(record_block(buf, starts))
+
+
+def iter_lines(file_path, chunk_size=CHUNK_SIZE, record_type=b'S', decoder=decode_s_records,
+               follow=False, poll_interval=1.0):
+    """
+    Stream a P1/90 file and yield one typed DataFrame per line block.
+
+    Only one chunk and the records of the line being read are held in memory,
+    so a month of files can be processed at constant memory. A line is yielded
+    as soon as the first record of the next line is read, or at the end of
+    the file.
+
+    Args:
+        file_path (str): Path to the P1/90 file
+        chunk_size (int): approximate number of bytes read per chunk
+        record_type (bytes): record identifier to decode, S for shots, V for preplots
+        decoder: function turning an (n, 80) record block into a DataFrame
+        follow (bool): keep reading a file that is still being written, the
+            line being acquired is yielded once the next line starts
+        poll_interval (float): seconds between reads at the end of a followed file
+
+    Yields:
+        DataFrame: records of one line block, see decode_s_records
+    """
+    name_start, name_stop = LINE_NAME_COLUMNS
+    pending = []
+
+    with open(file_path, 'rb') as f:
+        for _, buf in iter_buffers(f, chunk_size, follow, poll_interval):
+            starts = record_starts(buf, record_type)
+            if len(starts) == 0:
+                continue
+            records = record_block(buf, starts)
+            names = records[:, name_start:name_stop]
+
+            change = np.ones(len(records), dtype=bool)
+            change[1:] = (names[1:] != names[:-1]).any(axis=1)
+            if pending and (pending[-1][-1, name_start:name_stop] != names[0]).any():
+                yield decoder(np.concatenate(pending))
+                pending = []
+            else:
+                change[0] = False
+
+            bounds = np.append(np.flatnonzero(change), len(records))
+            if bounds[0] != 0:
+                pending.append(records[:bounds[0]])
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                if pending:
+                    yield decoder(np.concatenate(pending))
+                pending = [records[start:stop]]
+
+    if pending:
+        yield decoder(np.concatenate(pending))
+
+
+def _timed_read_srecords(file_path):
+    t0 = time.perf_counter()
+    df = read_srecords(file_path)
+    return file_path, df, time.perf_counter() - t0
+
+
+def read_srecords_batch(files, workers=None):
+    """
+    Read the S records of many P1/90 files in a process pool.
+
+    Args:
+        files (str or list): glob pattern or list of P1/90 paths
+        workers (int): number of worker processes, defaults to the cpu count
+
+    Returns:
+        tuple: (DataFrame of all shots ordered by jday and time, DataFrame of
+        per-file timing with file, records and seconds columns)
+    """
+    if isinstance(files, str):
+        files = sorted(glob.glob(files))
+
+    frames = {}
+    timing = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_timed_read_srecords, file_path) for file_path in files]
+        for future in as_completed(futures):
+            file_path, df, seconds = future.result()
+            frames[file_path] = df
+            timing.append({'file': file_path, 'records': len(df), 'seconds': seconds})
+
+    if not frames:
+        return decode_s_records(np.empty((0, RECORD_LENGTH), dtype=np.uint8)), pd.DataFrame(timing)
+
+    ordered = [frames[file_path] for file_path in files]
+    # concat keeps the categorical dtype only when every frame has the same categories
+    linenames = pd.api.types.union_categoricals([df['linename'] for df in ordered], sort_categories=True)
+    for df in ordered:
+        df['linename'] = df['linename'].cat.set_categories(linenames.categories)
+
+    shots = pd.concat(ordered, ignore_index=True)
+    shots = shots.sort_values(['jday', 'time'], kind='stable', ignore_index=True)
+    return shots, pd.DataFrame(timing).sort_values('file', ignore_index=True)
+
+
+class P190File:
+    """
+    All record types of a P1/90 file as separate typed tables.
+
+    The file is read and its line starts found once when opened. Each table is
+    decoded the first time it is asked for and then kept, so a shot-only job
+    never pays for the receiver group records. Type 1 tables (shots, vessels,
+    others) carry their own linename and sp, receiver groups are given the
+    linename and sp of the shot they belong to, so every table joins on
+    ['linename', 'sp'].
+    """
+
+    def __init__(self, file_path, receivers_before_shot=True):
+        """
+        Args:
+            file_path (str): Path to the P1/90 file
+            receivers_before_shot (bool): True when a shot's R records are
+                written before its S record (Orca/BOEM exports), False when
+                they follow it
+        """
+        self.file_path = file_path
+        self.receivers_before_shot = receivers_before_shot
+        self._buf = load_buffer(file_path)
+        self._line_starts = record_starts(self._buf, None)
+        self._types = self._buf[self._line_starts]
+        self._tables = {}
+
+    def record_types(self):
+        """Record identifiers present in the file with their counts."""
+        types, counts = np.unique(self._types, return_counts=True)
+        return {chr(t): int(c) for t, c in zip(types, counts)}
+
+    def starts(self, record_type):
+        """Byte offsets of every record of one type."""
+        return self._line_starts[self._types == ord(record_type)]
+
+    def table(self, record_type):
+        """Decoded table of one record type, decoded on first access."""
+        if record_type not in self._tables:
+            records = record_block(self._buf, self.starts(record_type))
+            if record_type == 'H':
+                self._tables[record_type] = decode_h_records(records)
+            elif record_type == 'R':
+                self._tables[record_type] = self._decode_receivers(records)
+            else:
+                self._tables[record_type] = decode_position_records(records)
+        return self._tables[record_type]
+
+    def _decode_receivers(self, records):
+        shot_starts = self.starts('S')
+        receiver_starts = self.starts('R')
+        if self.receivers_before_shot:
+            owner = np.searchsorted(shot_starts, receiver_starts, side='left')
+        else:
+            owner = np.searchsorted(shot_starts, receiver_starts, side='right') - 1
+        owned = (owner >= 0) & (owner < len(shot_starts))
+
+        groups = decode_r_records(records[owned])
+        shots = self.shots
+        shot_of_group = owner[owned][groups['record'].to_numpy()]
+        groups.insert(0, 'linename', shots['linename'].array.take(shot_of_group))
+        groups.insert(1, 'sp', shots['sp'].to_numpy()[shot_of_group])
+        return groups.drop(columns='record')
+
+    @property
+    def headers(self):
+        return self.table('H')
+
+    @property
+    def shots(self):
+        return self.table('S')
+
+    @property
+    def vessels(self):
+        return self.table('V')
+
+    @property
+    def others(self):
+        return self.table('Z')
+
+    @property
+    def receivers(self):
+        return self.table('R')
@@ -1,132 +1,102 @@
 import re
+import numpy as np
 import pandas as pd
 
+from crs_registry import UTM15N_NAD27, grid_to_geographic
+from nav_cache import cached_parse
+from p190_reader import (byte_columns, dms_to_decimal, load_buffer, names_to_categorical, parse_integers,
+                         parse_numbers, record_block, record_starts)
+
+
+# KMS 4D S record layout, (start, stop) byte columns
+FOURD_PREPLOT_FIELDS = {
+    'linename': (1, 5),
+    'shotpoint': (21, 25),
+    'latitude': (25, 35),
+    'longitude': (35, 46),
+    'easting': (47, 55),
+    'northing': (55, 64),
+}
+
+
+# Decodes a block of KMS 4D S records, every fixed-width field for all records at once
+# shotpoint is integer, lat/lon are signed decimal degrees, all coordinates float64
+# also the decoder of a P190Index over a 4D preplot, see P190Index
+def decode_4d_records(records):
+    columns = byte_columns(records)
+
+    def field(name):
+        start, stop = FOURD_PREPLOT_FIELDS[name]
+        return columns[start:stop].T
+
+    df = pd.DataFrame({
+        'linename': names_to_categorical(field('linename')),
+        'shotpoint': parse_integers(field('shotpoint')),
+        'latitude': dms_to_decimal(field('latitude'), 2),
+        'longitude': dms_to_decimal(field('longitude'), 3),
+        'easting': parse_numbers(field('easting')),
+        'northing': parse_numbers(field('northing')),
+    })
+    return df
 
 
+# Reads the S records of a KMS 4D preplot, see decode_4d_records
+@cached_parse(version=2)
 def get_4d_preplot_from_file(file_path):
-    # Read the file into a pandas DataFrame, assuming each line is a new record
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-
-    # Initialize an empty list to hold the parsed data
-    data_list = []
-
-    # Loop through each line and extract the data using string slicing
-    for line in lines:
-        # Skip lines that don't start with 'S' (as those are the data lines we care about)
-        if not line.startswith('S'):
-            continue
-
-        # Preplot line (e.g., 5007)
-        preplot_line = line[1:5]
-
-        # Shotpoint (e.g., 5950273017.60N)
-        shotpoint = line[21:25].strip()
-
-        # Latitude (degrees, minutes, seconds, N/S)
-        lat_deg = int(line[25:27])
-        lat_min = int(line[27:29])
-        lat_sec = float(line[29:34])
-        lat_hemisphere = line[34]
-
-        # Longitude (degrees, minutes, seconds, E/W)
-        lon_deg = int(line[35:38])
-        lon_min = int(line[38:40])
-        lon_sec = float(line[40:45])
-        lon_hemisphere = line[45]
-
-        # Easting and Northing
-        easting = float(line[47:55].strip())
-        northing = float(line[55:64].strip())
-
-        # Convert latitude and longitude to decimal degrees
-        latitude = lat_deg + lat_min / 60 + lat_sec / 3600
-        longitude = lon_deg + lon_min / 60 + lon_sec / 3600
-
-        # Apply hemisphere adjustments
-        if lat_hemisphere == 'S':
-            latitude = -latitude
-        if lon_hemisphere == 'W':
-            longitude = -longitude
-
-        # Append the extracted values to the list
-        data_list.append({
-            "linename": preplot_line,
-            "shotpoint": shotpoint,
-            "latitude": latitude,
-            "longitude": longitude,
-            "easting": easting,
-            "northing": northing,
-        })
-
-    # Convert the list of data dictionaries to a pandas DataFrame
-    df = pd.DataFrame(data_list)
-    return df
+    buf = load_buffer(file_path)
+    # only the bytes up to the last field are copied out of the file buffer
+    width = max(stop for _, stop in FOURD_PREPLOT_FIELDS.values())
+    return decode_4d_records(record_block(buf, record_starts(buf, b'S'), width))
+
+# Adds WGS84 lat/lon from the grid coordinates, the 4D preplot is NAD27 UTM15N
+def add_wgs84_coordinates(fourd_preplot_df, source_crs=UTM15N_NAD27):
+    latitude, longitude = grid_to_geographic(fourd_preplot_df['easting'].to_numpy(dtype=float),
+                                             fourd_preplot_df['northing'].to_numpy(dtype=float),
+                                             source_crs)
+    return fourd_preplot_df.assign(latitude_wgs84=latitude, longitude_wgs84=longitude)
 
 def get_4d_preplot_endpoints(fourd_preplot_df):
-    # Sort the DataFrame by 'preplot_line' and 'shotpoint' for sequential order
-    df = fourd_preplot_df.sort_values(by=['linename', 'shotpoint'])
-
-    # Initialize a list to store processed data
-    processed_data = []
-
-    # Group by each preplot_line to get the first and last points
-    for preplot_line, group in df.groupby('linename'):
-        # Get first and last rows of each group
-        first = group.iloc[0]
-        last = group.iloc[-1]
-
-        # Extract values for first point
-        shotpoint1 = first['shotpoint']
-        eastings1 = first['easting']
-        northings1 = first['northing']
-        latitude1 = first['latitude']
-        longitude1 = first['longitude']
-
-        # Extract values for last point
-        shotpoint2 = last['shotpoint']
-        eastings2 = last['easting']
-        northings2 = last['northing']
-        latitude2 = last['latitude']
-        longitude2 = last['longitude']
-
-        # Calculate radial distance (Euclidean distance)
-        length = np.sqrt((eastings2 - eastings1)**2 +
-                         (northings2 - northings1)**2)
-
-        # Calculate azimuth (angle in degrees from north)
-        delta_east = eastings2 - eastings1
-        delta_north = northings2 - northings1
-        azimuth = np.degrees(np.arctan2(delta_east, delta_north)) % 360
-
-        # Append the processed row to the list
-        processed_data.append({
-            "linename": preplot_line,
-            "sp1": shotpoint1,
-            "east1": eastings1,
-            "north1": northings1,
-            "lat1_deg": latitude1,
-            "lon1_deg": longitude1,
-            "sp2": shotpoint2,
-            "east2": eastings2,
-            "north2": northings2,
-            "lat2_deg": latitude2,
-            "lon2_deg": longitude2,
-            "length": length,
-            "azimuth": azimuth
-        })
-
-    # Create a new DataFrame from the processed data
-    result_df = pd.DataFrame(processed_data)
+    # Rows are picked by position, the index of joined preplots need not be unique
+    fourd_preplot_df = fourd_preplot_df.reset_index(drop=True)
+
+    # Shotpoints compare as numbers, not strings
+    shotpoint = pd.to_numeric(fourd_preplot_df['shotpoint'])
+
+    # One grouped pass gives the rows of the first and last shotpoint of every line
+    ends = shotpoint.groupby(fourd_preplot_df['linename'], sort=True, observed=True).agg(['idxmin', 'idxmax'])
+
+    points = fourd_preplot_df[['easting', 'northing', 'latitude', 'longitude']].assign(shotpoint=shotpoint)
+    first = points.loc[ends['idxmin']].set_axis(ends.index)
+    last = points.loc[ends['idxmax']].set_axis(ends.index)
+
+    result_df = pd.DataFrame({
+        'linename': ends.index,
+        'sp1': first['shotpoint'].to_numpy(),
+        'east1': first['easting'].to_numpy(),
+        'north1': first['northing'].to_numpy(),
+        'lat1_deg': first['latitude'].to_numpy(),
+        'lon1_deg': first['longitude'].to_numpy(),
+        'sp2': last['shotpoint'].to_numpy(),
+        'east2': last['easting'].to_numpy(),
+        'north2': last['northing'].to_numpy(),
+        'lat2_deg': last['latitude'].to_numpy(),
+        'lon2_deg': last['longitude'].to_numpy(),
+    })
+
+    # Radial distance and azimuth (degrees from north) for every line at once
+    delta_east = result_df['east2'] - result_df['east1']
+    delta_north = result_df['north2'] - result_df['north1']
+    result_df['length'] = np.hypot(delta_east, delta_north)
+    result_df['azimuth'] = np.degrees(np.arctan2(delta_east, delta_north)) % 360
+
     return result_df
 
 if __name__ == '__main__':
 
-    import numpy as np
-
     f = r"Y:\NAV\01_Projects\0_KMS_3D_OBN_MT3007424\Preplots\KMS4D2024_NAD27_UTM15N_v2-1_Orca\KMS4D2024_NAD27_UTM15N_v2-1_Orca.190"
 
     df = get_4d_preplot_from_file(f)
+    df = add_wgs84_coordinates(df)
 
     endpoints_df = get_4d_preplot_endpoints(df)
     print(endpoints_df.head())
\ No newline at end of file
@@ -1,103 +1,51 @@
 import pandas as pd
-from pyproj import Proj, transform
-import math 
+import numpy as np
+
+from crs_registry import UTM15N_WGS84, grid_to_geographic
+from nav_cache import cached_parse
+from p190_reader import decode_v_records, iter_chunks
+
+
+# Coverts P190 preplot to a dataframe of line endpoints, cached until the preplot changes
+# all columns are numeric, lat/lon in decimal degrees
+@cached_parse(version=2)
+def read_preplot_coordinates(preplot):
+
+    # stream the V records a chunk at a time and keep the first and last point of each line in it
+    ends = []
+    for chunk in iter_chunks(preplot, record_type=b'V', decoder=decode_v_records):
+        chunk_lines = chunk.groupby('linename', sort=False, observed=True)
+        ends += [chunk_lines.head(1), chunk_lines.tail(1)]
+    points = pd.concat(ends, ignore_index=True)
+    points['linename'] = points['linename'].astype(str)
+    points = points.rename(columns={'long': 'lon'})
+
+    # get first SP from the first chunk a line is in and last SP from its last chunk
+    lines = points.groupby('linename', sort=False)
+    first = lines.first().add_suffix('1')
+    last = lines.last().add_suffix('2')
+    df = pd.concat([first, last], axis=1).reset_index()
+
+    # line geometry, E/N rounded to mm as before
+    df['dE'] = (df['east2'].round(3) - df['east1'].round(3)).round(3)
+    df['dN'] = (df['north2'].round(3) - df['north1'].round(3)).round(3)
+    df['Az'] = (np.degrees(np.arctan2(df['dE'], df['dN'])) % 360).round(3)
+    df['length'] = np.hypot(df['dE'], df['dN'])
+
+    return df
+
 
 class PreplotToCsv:
 
-    def __init__(self, preplot_path):
+    # crs is the grid the preplot E/N are in, lat/lon are always WGS84
+    def __init__(self, preplot_path, crs=UTM15N_WGS84):
         self.preplot = preplot_path
+        self.crs = crs
 
     # Coverts P190 preplot to a dataframe
     def get_preplot_coordinates(self):
 
-        # preplot = preplot_path
-        full_lines = []
-        with open(self.preplot, 'r') as f:
-            flines = f.readlines()
-
-            for line in flines:
-
-                if line[0] == 'V':
-                    line = line.strip('\n')
-                    line = line.split()
-                    entry = dict()
-                    entry['linename'] = line[0][1:]
-                    entry['sp'] = line[1][0:5]
-                    entry['lat'] = line[1][5:15]
-                    entry['lon'] = line[1][15:]
-                    entry['east'] = line[2][0:8]
-                    entry['north'] = line[2][8:]
-                    full_lines.append(entry)
-                #print(entry)
-# get first SP in else condition and last SP in if condition
-        data_dict = {}
-        for line in full_lines:
-            name = line['linename']
-
-            if name in data_dict: #if line name is in the data_dict,
-                data_dict[f'{name}']['sp2'] = line['sp']
-                data_dict[f'{name}']['lat2'] = line['lat']
-                data_dict[f'{name}']['lon2'] = line['lon']
-                data_dict[f'{name}']['east2'] = line['east']
-                data_dict[f'{name}']['north2'] = line['north']
-            else: #if line name not exists in data_dict, get SP1
-                data_dict[f'{name}'] = {}
-                data_dict[f'{name}']['sp1'] = line['sp']
-                data_dict[f'{name}']['lat1'] = line['lat']
-                data_dict[f'{name}']['lon1'] = line['lon']
-                data_dict[f'{name}']['east1'] = line['east']
-                data_dict[f'{name}']['north1'] = line['north']
-
-        df = pd.DataFrame.from_dict(data=data_dict, orient='index')
-        df.reset_index(inplace=True)
-        df = df.rename(columns={'index': 'linename'})
-        #print(df)
-
-        # function to get preplot length
-        def get_dy(north2, north1):
-            dy = round(round(float(north2), 3) - round(float(north1), 3), 3)
-            return dy
-
-        def get_dx(east2, east1):
-            dx = round(round(float(east2), 3) - round(float(east1), 3), 3)
-            return dx
-
-        def get_az(dx, dy):
-            if dx > 0 and dy > 0:
-                az = round(90 - math.degrees(math.atan(dy/dx)), 3)
-                return az
-            elif dx > 0 and dy < 0:
-                dy = abs(dy)
-                az = round(90 + math.degrees(math.atan(dy/dx)), 3)
-                return az
-            elif dx < 0 and dy < 0:
-                dx = abs(dx)
-                dy = abs(dy)
-                az = round(270 + math.degrees(math.atan(dy/dx)), 3)
-                return az
-            elif dx < 0 and dy > 0:
-                dx = abs(dx)
-                az = round(270 + math.degrees(math.atan(dy/dx)), 3)
-                return az
-            elif dx == 0 and dy > 0:
-                return 0.0
-            elif dx == 0 and dy < 0:
-                return 180.0
-            elif dx > 0 and dy == 0:
-                return 90.0
-            elif dx < 0 and dy == 0:
-                return 270.0
-            
-        def get_distance(dE, dN):
-            d = (dE**2 + dN**2)**0.5
-            return d
-
-        df['dE'] = df.apply(lambda x: get_dx(x['east2'], x['east1']), axis=1)
-        df['dN'] = df.apply(lambda x: get_dy(x['north2'], x['north1']), axis=1)
-        df['Az'] = df.apply(lambda x: get_az(x['dE'], x['dN']), axis=1)
-        df['length'] = df.apply(lambda x: get_distance(x['dE'], x['dN']), axis=1)
-
-        return df
+        return read_preplot_coordinates(self.preplot)
 
     # returns dataframe of start and end points
     def create_points(self):
@@ -108,53 +56,56 @@ class PreplotToCsv:
 
         return startpoint_df, endpoint_df
 
-    # returns a dictionary of preplot lines dataframes
-    def get_preplot_shots(self):
-
-        spi = 16.666666666667
+    # returns one dataframe of every preplot shot, densified at the SPI along each line
+    def get_preplot_shot_table(self, spi=16.666666666667):
 
         df = self.get_preplot_coordinates()
-        numrows = len(df.index)
-
-        def grid_to_geographic(easting, northing):
-
-            # Define UTM projection
-            utm_proj = Proj(proj="utm", zone=15, datum="WGS84", ellps="WGS84")
-            # Define WGS 84 projection
-            wgs84_proj = Proj(proj="latlong", datum="WGS84", ellps="WGS84")
 
-            longitude, latitude = transform(utm_proj, wgs84_proj, easting, northing)
-            return latitude, longitude
+        length = df['length'].to_numpy()
+        e0 = df['east1'].to_numpy()
+        n0 = df['north1'].to_numpy()
+        sp0 = df['sp1'].to_numpy(dtype=np.int64)
+        az = np.radians(df['Az'].to_numpy())
+
+        # shots per line, then the line and the shot index along the line of every shot
+        counts = np.round(np.trunc(length) / spi).astype(int) + 1
+        line = np.repeat(np.arange(len(df)), counts)
+        i = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        d = spi * i
+        east = e0[line] + d * np.sin(az[line])
+        north = n0[line] + d * np.cos(az[line])
+
+        lat, lon = grid_to_geographic(east, north, self.crs)
+
+        shots = pd.DataFrame({
+            'linename': df['linename'].to_numpy()[line],
+            'sp': sp0[line] + i,
+            'east': east,
+            'north': north,
+            'lat': lat,
+            'lon': lon,
+        })
+        return shots
 
-        df_dict = {}
-        for k, v in df['linename'].items():
-
-            d0 = int(df.at[k, 'length'])
-            e0 = float(df.at[k, 'east1'])
-            n0 = float(df.at[k, 'north1'])
-            sp0 = int(df.at[k, 'sp1'])
-            a = float(df.at[k, 'Az'])
+    # returns a dictionary of preplot lines dataframes
+    def get_preplot_shots(self):
 
-            segments = round(d0/spi)
-            data_list = []
+        shots = self.get_preplot_shot_table()
 
-            for i in range(segments+1):
-                d = spi*i
-                e = e0 + d * math.sin(math.radians(a))
-                n = n0 + d * math.cos(math.radians(a))
-                sp = sp0 + i
-                lat, lon = grid_to_geographic(e, n)
-                point = [sp, e, n, lat, lon]
-                data_list.append(point)
+        # lines are contiguous in the shot table, so each line is a row slice of it
+        names = shots['linename'].to_numpy()
+        bounds = np.flatnonzero(names[1:] != names[:-1]) + 1
+        starts = np.concatenate(([0], bounds))
+        stops = np.concatenate((bounds, [len(shots)]))
 
-            df_dict[f'{v}'] = pd.DataFrame(data=data_list, columns=['sp', 'east', 'north', 'lat', 'lon'])
+        points = shots[['sp', 'east', 'north', 'lat', 'lon']]
+        df_dict = {f'{names[a]}': points.iloc[a:b].reset_index(drop=True)
+                   for a, b in zip(starts, stops)}
         return df_dict
 
-
 if __name__ == '__main__':
-    import pandas as pd
     import os
-    import math
 
     preplot_fullpath = r"Y:\NAV\01_Projects\0_MT2005724_Engament5_Gain_Test\Preplots\Engagement5_20240705_SRC_WGS84_UTM15N_Orca.p190"
     points_csv = r"Y:\NAV\01_Projects\0_MT2005724_Engament5_Gain_Test\QGIS\Preplots"
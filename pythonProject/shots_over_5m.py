@@ -1,6 +1,81 @@
 import pandas as pd
 import os
-from io import StringIO
+import codecs
+from io import BytesIO
+
+from eol_schema import read_typed_csv
+from nav_cache import cached_parse
+from nav_catalog import find_product_files
+
+SOURCE_DRIFT_COLUMNS = ['Shot #', 'Time', 'A1 SP DDA m', 'A2 SP DDA m', 'A3 SP DDA m',
+                        'A1 SP DDC m', 'A2 SP DDC m', 'A3 SP DDC m',
+                        'A1 SP DDR m', 'A2 SP DDR m', 'A3 SP DDR m']
+SOURCE_DRIFT_HEADER = ','.join(SOURCE_DRIFT_COLUMNS).encode('ascii')
+
+
+def sniff_encoding(data, prefix_size=64 * 1024):
+    """utf-8 when the start of the file decodes as such, latin1 otherwise, which never fails."""
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(data[:prefix_size], final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin1'
+
+
+def _next_line(data, pos):
+    end = data.find(b'\n', pos)
+    return len(data) if end < 0 else end + 1
+
+
+def _data_block(data):
+    """Byte range of the rows under the SourceDrift header, None when the header is missing."""
+    found = data.find(SOURCE_DRIFT_HEADER)
+    if found < 0:
+        return None
+    # data starts 2 lines after the header and ends at the first empty line after that
+    header_start = data.rfind(b'\n', 0, found) + 1
+    data_start = _next_line(data, _next_line(data, header_start))
+    # a blank line is a line break followed by another, searched from the line after the data start
+    search_from = _next_line(data, data_start) - 1
+    blanks = [i + 1 for i in (data.find(b'\n\n', search_from), data.find(b'\n\r\n', search_from)) if i >= 0]
+    return data_start, min(blanks, default=len(data))
+
+
+@cached_parse(version=2)
+def read_source_drift(file_path):
+    """
+    Read the drift of every shot from a SourceDrift CSV file.
+
+    The file is read once as bytes, the header and the end of its block are
+    found by byte search and only that block is decoded and parsed.
+
+    Args:
+        file_path (str): Path to the SourceDrift CSV file
+
+    Returns:
+        DataFrame: SOURCE_DRIFT_COLUMNS, typed as registered in eol_schema
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+
+    block = _data_block(data)
+    if block is None:
+        raise ValueError('SourceDrift header not found')
+    data_start, end = block
+
+    # the encoding is sniffed from the start of the file, a later byte that is not
+    # utf-8 falls back to latin1 like the encodings tried one by one before
+    for encoding in dict.fromkeys([sniff_encoding(data), 'latin1']):
+        try:
+            # Read CSV with custom column names
+            return read_typed_csv(BytesIO(data[data_start:end]),
+                                  names=SOURCE_DRIFT_COLUMNS,    # Use our custom column names
+                                  header=None,                   # Tell pandas there's no header row in the data
+                                  encoding=encoding)
+        except UnicodeDecodeError:
+            if encoding == 'latin1':
+                raise
+
 
 def find_shots_over_threshold(file_path, threshold=5.0):
     """
@@ -12,73 +87,23 @@ def find_shots_over_threshold(file_path, threshold=5.0):
         
     Returns:
         DataFrame: Contains rows where drift exceeds threshold
+
+    Raises:
+        ValueError: the file has no SourceDrift block or it cannot be parsed
     """
-    encodings = ['utf-8', 'latin1', 'iso-8859-1', 'cp1252']
-    
-    for encoding in encodings:
-        try:
-            # Read the entire file into a list
-            with open(file_path, 'r', encoding=encoding) as f:
-                lines = f.readlines()
-                # print(encoding)
-            
-            # Find the header line
-            header_line = None
-            for i, line in enumerate(lines):
-                if 'Shot #,Time,A1 SP DDA m,A2 SP DDA m,A3 SP DDA m,A1 SP DDC m,A2 SP DDC m,A3 SP DDC m,A1 SP DDR m,A2 SP DDR m,A3 SP DDR m' in line:
-                    header_line = i
-                    # print(header_line)
-                    break
-            
-            if header_line is None:
-                continue  # Try next encoding if header not found
-            
-            # Find the first empty line after the header
-            end_line = None
-            for i in range(header_line + 3, len(lines)):
-                if lines[i].strip() == '':
-                    end_line = i
-                    # print(end_line)
-                    break
-            
-            if end_line is None:
-                end_line = len(lines)  # If no empty line found, read to end
-            
-            # Data starts 2 lines after header and ends at the empty line
-            data_start = header_line + 2
-
-            # print(lines[data_start:end_line])
-            # Define your custom column names
-            columns = ['Shot #', 'Time', 'A1 SP DDA m', 'A2 SP DDA m', 'A3 SP DDA m', 
-                       'A1 SP DDC m', 'A2 SP DDC m', 'A3 SP DDC m', 
-                       'A1 SP DDR m', 'A2 SP DDR m', 'A3 SP DDR m']
-            
-            # Read CSV with custom column names
-            df = pd.read_csv(StringIO(''.join(lines[data_start:end_line])), 
-                            names=columns,    # Use our custom column names
-                            header=None)      # Tell pandas there's no header row in the data
+    df = read_source_drift(file_path)
 
-            # Create new DataFrame with only Shot # and A2 SP DDC m columns
-            df_filtered = df[['Shot #', 'A2 SP DDC m']].dropna()
+    # Create new DataFrame with only Shot # and A2 SP DDC m columns
+    df_filtered = df[['Shot #', 'A2 SP DDC m']].dropna()
 
+    # Create new DataFrame with shots where |A2 SP DDC m| > 5
+    df_over_5 = df_filtered[abs(df_filtered['A2 SP DDC m']) > threshold]
+    print("\nShots with absolute A2 SP DDC m value over 5:")
+    # print(df_over_5)
 
-            # Create new DataFrame with shots where |A2 SP DDC m| > 5
-            df_over_5 = df_filtered[abs(df_filtered['A2 SP DDC m']) > threshold]
-            print("\nShots with absolute A2 SP DDC m value over 5:")
-            # print(df_over_5)
+    return df_over_5
 
-            return df_over_5
-                
-        except UnicodeDecodeError:
-            continue  # Try next encoding if current one fails
-        except Exception as e:
-            print(f"Error processing {file_path}: {str(e)}")
-            continue  # Try next encoding if other errors occur
-    
-    print(f"Could not read file {file_path} with any supported encoding")
-    return pd.DataFrame()
-
-def process_sequence_source_drift(directory_path, sequence_number, threshold=5.0):
+def process_sequence_source_drift(directory_path, sequence_number, threshold=5.0, file_paths=None):
     """
     Process SourceDrift CSV files for a specific sequence number.
     
@@ -86,28 +111,39 @@ def process_sequence_source_drift(directory_path, sequence_number, threshold=5.0
         directory_path (str): Path to directory containing SourceDrift files
         sequence_number (str): Four-digit sequence number to process (e.g., '1013')
         threshold (float): Drift threshold in meters (default 5.0)
+        file_paths (list): SourceDrift files of the sequence when already known, searched for when None
+
+    Returns:
+        list: (file path, error message) of the files that could not be read
     """
     
-    # Use os.walk to search through all subdirectories
-    found_files = []
-    for root, dirs, files in os.walk(directory_path):
-        for file in files:
-            if f'{sequence_number}-SourceDrift.csv' in file:
-                full_path = os.path.join(root, file)
+    if file_paths is not None:
+        found_files = list(file_paths)
+    else:
+        # Search all subdirectories through the saved catalog of the tree
+        found_files = []
+        for full_path in find_product_files(directory_path, 'SourceDrift'):
+            if f'{sequence_number}-SourceDrift.csv' in os.path.basename(full_path):
                 found_files.append(full_path)
                 print(f"Found file: {full_path}")
     
     if not found_files:
         print(f"No SourceDrift CSV files found for sequence {sequence_number}")
-        return
+        return []
     
     # Create a list to store all results
     all_results = []
+    errors = []
     
-    # Process each file
+    # Process each file, a file that cannot be read is reported and does not stop the others
     for file_path in found_files:
         print(f"\nProcessing sequence {sequence_number} file:", os.path.basename(file_path))
-        result = find_shots_over_threshold(file_path, threshold)
+        try:
+            result = find_shots_over_threshold(file_path, threshold)
+        except (OSError, ValueError) as e:
+            print(f"Error processing {file_path}: {str(e)}")
+            errors.append((file_path, str(e)))
+            continue
         if not result.empty:
             all_results.append(result)
     
@@ -131,6 +167,10 @@ def process_sequence_source_drift(directory_path, sequence_number, threshold=5.0
     else:
         print(f"\nNo shots over threshold found for sequence {sequence_number}")
 
+    if errors:
+        print(f"\n{len(errors)} SourceDrift files of sequence {sequence_number} could not be read")
+    return errors
+
 # Example usage:
 if __name__ == "__main__":
 
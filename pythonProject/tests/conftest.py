@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+# the modules under test import each other from pythonProject
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from eol_samples import write_report
+from nav_cache import ParseCache, get_cache, set_cache
+from p190_samples import write_p190
+
+
+@pytest.fixture(autouse=True)
+def parse_cache(tmp_path):
+    """Every test gets an empty parse cache of its own, the user's cache is never touched."""
+    previous = get_cache()
+    cache = ParseCache(cache_dir=str(tmp_path / 'parse_cache'))
+    set_cache(cache)
+    yield cache
+    set_cache(previous)
+
+
+@pytest.fixture(params=['\n', '\r\n'], ids=['lf', 'crlf'])
+def p190(tmp_path, request):
+    """Synthetic P1/90 with H, R, V and S records, see p190_samples.LINES."""
+    return write_p190(tmp_path / 'test.p190', request.param)
+
+
+@pytest.fixture(params=['\n', '\r\n'], ids=['lf', 'crlf'])
+def report(tmp_path, request):
+    """Synthetic EOL report, see eol_samples.SECTIONS."""
+    return write_report(tmp_path / '5391121001-EOL_Report.csv', request.param)
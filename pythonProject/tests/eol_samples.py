@@ -0,0 +1,23 @@
+"""Synthetic EOL report shared by the EOL reader tests."""
+
+SECTIONS = {
+    'Vessel Crab Angle': ['Shot #,Time,V1 Heading °,V1 Crab °',
+                          '1001,01/02/2024 10:00:00,90.5,1.25',
+                          '1002,01/02/2024 10:00:10,90.7,-0.5',
+                          '1003,01/02/2024 10:00:20,91.0,2.0'],
+    'Network Quality': ['Shot #,Time,main DOF,main Quality,Comment',
+                        '1001,01/02/2024 10:00:00,12,0.91,ok',
+                        '1002,,11,0.85,°late',
+                        '1003,01/02/2024 10:00:20,13,0.95,'],
+    'Empty Section': ['Shot #,Time,V1 SMA m'],
+    'Repeated Columns': ['Shot #,Time,A1 SP DDC m,A1 SP DDC m',
+                         '1001,01/02/2024 10:00:00,0.5,0.75'],
+}
+
+
+def write_report(path, newline='\n'):
+    lines = ['EOL_Report,5391121001']
+    for title, (header, *rows) in SECTIONS.items():
+        lines += [title, '', header, ''] + rows + ['']
+    path.write_bytes(newline.join(lines).encode('ISO-8859-1') + newline.encode())
+    return str(path)
@@ -0,0 +1,67 @@
+"""Synthetic P1/90 files and the per line decode the byte readers replaced, shared by the P1/90 tests."""
+import pandas as pd
+
+LINES = [('5391121001', 1001, 40), ('5391121002', 2001, 25), ('5391121001', 1041, 10)]
+
+
+def dms(value, deg_width, hemispheres):
+    hemisphere = hemispheres[0] if value >= 0 else hemispheres[1]
+    value = abs(value)
+    deg = int(value)
+    mins = int((value - deg) * 60)
+    secs = (value - deg - mins / 60) * 3600
+    return f'{deg:0{deg_width}d}{mins:02d}{secs:05.2f}{hemisphere}'
+
+
+def position_record(kind, line, sp, i, vessel='1'):
+    lat, lon = 27.5 + i * 1e-4, -90.25 - i * 1e-4
+    hms = f'{(i // 3600) % 24:02d}{(i // 60) % 60:02d}{i % 60:02d}'
+    record = (f'{kind}{line:<12}   {vessel}11 {sp:>5}{dms(lat, 2, "NS")}{dms(lon, 3, "EW")} '
+              f'{500000 + i * 12.5:8.1f}{3000000 + i * 6.25:9.1f}{5 + i % 7:6.1f}{100 + i // 50:03d}{hms} ')
+    assert len(record) == 80
+    return record
+
+
+def receiver_record(shot, streamer='1'):
+    groups = ''.join(f'{g:>4}{600000 + shot + g:9.1f}{3100000 + shot - g:9.1f}{10 + g % 5:4.1f}'
+                     for g in range(1, 4))
+    record = f'R{groups}{streamer}'
+    assert len(record) == 80
+    return record
+
+
+def write_p190(path, newline='\n'):
+    lines = [f'{"H0100SURVEY AREA":<32}{"Gulf of Mexico":<48}']
+    i = 0
+    for line, first_sp, count in LINES:
+        for sp in range(first_sp, first_sp + count):
+            lines.append(receiver_record(i))
+            lines.append(position_record('V', line, sp, i))
+            lines.append(position_record('S', line, sp, i))
+            i += 1
+    path.write_bytes(newline.join(lines).encode('ascii') + newline.encode())
+    return str(path)
+
+
+def reference_srecords(file_path):
+    """Per line string slicing, as srecords_to_df did before the byte reader."""
+    def degrees(text, deg_width):
+        value = float(text[:deg_width]) + float(text[deg_width:deg_width + 2]) / 60 + float(text[deg_width + 2:-1]) / 3600
+        return -value if text[-1] in 'SW' else value
+
+    rows = []
+    with open(file_path, 'r') as f:
+        for line in f:
+            if line[0] == 'S':
+                hms = int(line[73:79])
+                rows.append({'linename': line[1:11].strip(), 'sp': int(line[20:25]),
+                             'lat': degrees(line[25:35], 2), 'long': degrees(line[35:46], 3),
+                             'east': float(line[47:55]), 'north': float(line[55:64]), 'depth': -float(line[64:70]),
+                             'jday': int(line[70:73]),
+                             'time': pd.Timedelta(seconds=hms // 10000 * 3600 + hms // 100 % 100 * 60 + hms % 100)})
+    return pd.DataFrame(rows)
+
+
+def assert_matches_reference(df, reference):
+    df = df.assign(linename=df['linename'].astype(str))
+    pd.testing.assert_frame_equal(df, reference, check_dtype=False, check_exact=False, rtol=0, atol=1e-9)
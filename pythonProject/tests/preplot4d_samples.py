@@ -0,0 +1,20 @@
+"""Synthetic KMS 4D preplot files, shared by the 4D preplot and repeatability tests."""
+from p190_samples import dms
+
+LINES = [('5007', 1001, 30, 'N'), ('5008', 2001, 20, 'E'), ('5009', 3001, 25, 'NE')]
+
+
+def s_record(line, sp, east, north):
+    lat, lon = 27.4 + (north - 3000000) * 9e-6, -90.3 + (east - 500000) * 1e-5
+    record = f'S{line:<4}{"":16}{sp:>4}{dms(lat, 2, "NS")}{dms(lon, 3, "EW")} {east:8.1f}{north:9.1f}'
+    return f'{record:<80}'
+
+
+def write_4d_preplot(path, lines=LINES):
+    records = ['H0100 KMS 4D PREPLOT']
+    for line, first_sp, count, heading in lines:
+        for i in range(count):
+            step = {'N': (0, 25), 'E': (25, 0), 'NE': (17.5, 17.5)}[heading]
+            records.append(s_record(line, first_sp + i, 500000 + int(line) + i * step[0], 3000000 + i * step[1]))
+    path.write_text('\n'.join(records) + '\n')
+    return str(path)
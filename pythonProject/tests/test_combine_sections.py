@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from eol_reader import combine_sections
+
+
+def combine(*frames, **kwargs):
+    return combine_sections({f'section {i}': df for i, df in enumerate(frames)}, **kwargs)
+
+
+def merge_sections(sections, keys=['Shot #', 'Time']):
+    """The chained outer merges combine_sections replaced, as reference."""
+    df = sections[0]
+    for section in sections[1:]:
+        df = pd.merge(df, section, on=keys, how='outer')
+    return df.sort_values(keys).reset_index(drop=True)
+
+
+def section(shots, times, **columns):
+    return pd.DataFrame({'Shot #': shots, 'Time': pd.to_datetime(times), **columns})
+
+
+def test_matches_chained_merges():
+    a = section([1001, 1002, 1003], ['2020-01-01', '2020-01-02', '2020-01-03'], dof=[1.0, 2.0, 3.0])
+    b = section([1002, 1003, 1004], ['2020-01-02', '2020-01-03', '2020-01-04'], quality=[0.5, 0.6, 0.7])
+    c = section([1001, 1004], ['2020-01-01', '2020-01-04'], sma=[9.0, 8.0])
+
+    combined = combine(a, b, c)
+    pd.testing.assert_frame_equal(combined, merge_sections([a, b, c]), check_dtype=False)
+
+
+def test_fill_value_keeps_dtype():
+    a = section(np.array([1, 2], dtype='int32'), ['2020-01-01', '2020-01-02'],
+                dof=np.array([1.0, 2.0], dtype='float32'))
+    b = section(np.array([2, 3], dtype='int32'), ['2020-01-02', '2020-01-03'], label=['x', 'y'])
+
+    combined = combine(a, b, fill_value=0)
+    assert combined['dof'].dtype == np.float32
+    assert combined['dof'].tolist() == [1.0, 2.0, 0.0]
+    # only numeric columns are filled
+    assert combined['label'].isna().tolist() == [True, False, False]
+
+
+def test_repeated_shots_paired_in_order():
+    a = section([1, 1, 2], ['2020-01-01', '2020-01-01', '2020-01-02'], dof=[1.0, 2.0, 3.0])
+    b = section([1, 1, 2], ['2020-01-01', '2020-01-01', '2020-01-02'], quality=[4.0, 5.0, 6.0])
+
+    combined = combine(a, b)
+    assert combined['dof'].tolist() == [1.0, 2.0, 3.0]
+    assert combined['quality'].tolist() == [4.0, 5.0, 6.0]
+
+
+def test_duplicate_column_names():
+    a = section([1], ['2020-01-01'], dof=[1.0])
+    b = section([1], ['2020-01-01'], dof=[2.0])
+
+    combined = combine(a, b)
+    assert list(combined.columns) == ['Shot #', 'Time', 'dof', 'dof.1']
+
+
+def test_missing_keys_kept_missing():
+    # a missing shot number or time is not decoded as another shot, as in pd.merge
+    a = section([1.0, np.nan, 3.0], ['2020-01-01', '2020-01-03', None], dof=[1.0, 2.0, 3.0])
+    b = section([1.0, 2.0, np.nan], ['2020-01-01', '2020-01-02', '2020-01-03'], quality=[4.0, 5.0, 6.0])
+
+    combined = combine(a, b)
+    pd.testing.assert_frame_equal(combined, merge_sections([a, b]), check_dtype=False)
+    assert len(combined) == 4
+    missing_shot = combined[combined['Shot #'].isna()]
+    assert missing_shot['Time'].tolist() == [pd.Timestamp('2020-01-03')]
+    assert missing_shot[['dof', 'quality']].values.tolist() == [[2.0, 6.0]]
+    assert combined[combined['Time'].isna()]['Shot #'].tolist() == [3.0]
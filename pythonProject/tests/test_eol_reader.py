@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from eol_reader import index_sections, read_eol_sections, section_columns
+from eol_samples import SECTIONS
+from eol_schema import parse_times
+
+
+def test_index_sections(report):
+    with open(report, 'rb') as f:
+        data = f.read()
+    sections = index_sections(data)
+    assert [s.title for s in sections] == list(SECTIONS)
+    assert sections[0].header == ['Shot #', 'Time', 'V1 Heading °', 'V1 Crab °']
+    assert sections[3].header == ['Shot #', 'Time', 'A1 SP DDC m', 'A1 SP DDC m.1']
+    assert sections[2].stop <= sections[2].start
+    first_rows = data[sections[0].start:sections[0].stop].decode('ISO-8859-1').splitlines()
+    assert first_rows[:3] == SECTIONS['Vessel Crab Angle'][1:]
+
+
+def test_read_sections(report):
+    sections = read_eol_sections(report)
+    crab = sections['Vessel Crab Angle']
+    assert crab['Shot #'].tolist() == [1001, 1002, 1003]
+    assert crab['V1 Crab °'].tolist() == [1.25, -0.5, 2.0]
+    assert crab['Time'].tolist() == [pd.Timestamp('2024-02-01 10:00:00'), pd.Timestamp('2024-02-01 10:00:10'),
+                                     pd.Timestamp('2024-02-01 10:00:20')]
+
+    network = sections['Network Quality']
+    assert network['Comment'].tolist()[:2] == ['ok', '°late']
+    assert network['Time'].isna().tolist() == [False, True, False]
+
+    assert sections['Empty Section'].empty
+    assert list(sections['Empty Section'].columns) == ['Shot #', 'Time', 'V1 SMA m']
+    assert sections['Repeated Columns'][['A1 SP DDC m', 'A1 SP DDC m.1']].values.tolist() == [[0.5, 0.75]]
+
+
+def test_read_sections_untimed(report):
+    sections = read_eol_sections(report, ['Crab'], parse_time=False)
+    assert sections['Vessel Crab Angle']['Time'].tolist()[0] == '01/02/2024 10:00:00'
+
+
+def test_titles_filter(report):
+    assert list(read_eol_sections(report, ['Crab', 'Network'])) == ['Vessel Crab Angle', 'Network Quality']
+
+
+def test_section_columns(report):
+    sections = read_eol_sections(report)
+    crab = section_columns(sections, 'Crab', {'Shot': 0, 'Time': 1, 'Crab_Angle': -1})
+    assert crab['Shot'].tolist() == [1001, 1002, 1003]
+    assert crab['Crab_Angle'].tolist() == [1.25, -0.5, 2.0]
+    assert crab['Shot'].dtype == np.int32
+    assert section_columns(sections, 'Empty', {'Shot': 0, 'SMA': 2}) is None
+    assert section_columns(sections, 'Network', {'Shot': 0, 'Comment': 9}) is None
+    assert section_columns(sections, 'Missing', {'Shot': 0}) is None
+
+
+def test_parse_times():
+    fixed = parse_times(['31/12/2023 23:59:59', '01/01/2024 00:00:00'])
+    assert pd.DatetimeIndex(fixed).tolist() == [pd.Timestamp('2023-12-31 23:59:59'), pd.Timestamp('2024-01-01')]
+    # other layouts go through pd.to_datetime, what does not parse is NaT
+    mixed = pd.DatetimeIndex(parse_times(['01/01/2024 00:00:00', '', '32/01/2024 00:00:00', None]))
+    assert mixed[0] == pd.Timestamp('2024-01-01') and mixed[1:].isna().all()
@@ -0,0 +1,41 @@
+import pandas as pd
+
+import eol_reader
+from eol_reader import EOLReport
+from eol_samples import SECTIONS
+
+
+def test_report_parses_on_first_access(report, monkeypatch):
+    parsed = []
+    parse_section = eol_reader.parse_section
+    monkeypatch.setattr(eol_reader, 'parse_section', lambda data, section, *args: parsed.append(section.title)
+                        or parse_section(data, section, *args))
+
+    with EOLReport(report) as sections:
+        assert parsed == []
+        assert len(sections) == 4
+        assert sections.section('Crab') is sections['Vessel Crab Angle']
+        assert sections.section('Missing') is None
+        assert parsed == ['Vessel Crab Angle']
+    # sections decoded before closing stay available
+    assert 'Vessel Crab Angle' in sections
+
+
+def test_report_is_a_mapping(report):
+    with EOLReport(report) as sections:
+        assert sections.titles == list(SECTIONS)
+        assert list(sections) == list(SECTIONS)
+        assert sections.get('Missing') is None
+
+
+def test_report_read_from_cache(report, monkeypatch):
+    with EOLReport(report) as sections:
+        first = sections['Network Quality']
+
+    def no_map(file_path):
+        raise AssertionError('the report was read again')
+
+    monkeypatch.setattr(eol_reader, '_map_file', no_map)
+    with EOLReport(report) as sections:
+        assert sections.titles == list(SECTIONS)
+        pd.testing.assert_frame_equal(sections['Network Quality'], first)
@@ -0,0 +1,55 @@
+import os
+
+import pandas as pd
+
+from eol_reader import find_eol_reports
+from eol_runner import EOLRunner
+from eol_samples import write_report
+
+
+def test_find_eol_reports(tmp_path):
+    folder = tmp_path / '00_NAV' / 'Seq1001' / 'PP_SP_Range'
+    os.makedirs(folder)
+    for name in ('5391121001', 'test1002', 'bble1003', 'Trial1004'):
+        write_report(folder / f'{name}-EOL_Report.csv')
+    root = tmp_path / '00_NAV'
+    assert [os.path.basename(p) for p in find_eol_reports(str(root))] == ['5391121001-EOL_Report.csv']
+
+
+def test_runner_shares_one_report(tmp_path, monkeypatch):
+    folder = tmp_path / '00_NAV' / 'Seq1001'
+    os.makedirs(folder)
+    write_report(folder / '5391121001-EOL_Report.csv')
+    write_report(folder / '5391121002-EOL_Report.csv')
+
+    opened = []
+    monkeypatch.setattr('eol_reader._map_file', lambda path: opened.append(path) or open(path, 'rb').read())
+
+    def crab(sections, line_name):
+        return sections.section('Crab')[['Shot #', 'V1 Crab °']]
+
+    def failing(sections, line_name):
+        raise ValueError(f'no data for {line_name}')
+
+    runner = EOLRunner(str(tmp_path / '00_NAV'))
+    runner.register('crab', crab).register('failing', failing)
+    results = runner.run()
+
+    assert sorted(results) == ['5391121001', '5391121002']
+    assert len(opened) == 2
+    # the failing analysis is recorded without stopping the others
+    assert [(name, error) for _, name, error in runner.errors] == [('failing', 'no data for 5391121001'),
+                                                                   ('failing', 'no data for 5391121002')]
+    summary = runner.summary('crab')
+    assert summary['Line'].tolist() == ['5391121001'] * 3 + ['5391121002'] * 3
+    assert summary['Shot #'].tolist() == [1001, 1002, 1003] * 2
+    assert runner.summary('failing').empty
+
+
+def test_unreadable_report_is_an_error(tmp_path):
+    runner = EOLRunner(str(tmp_path))
+    runner.register('crab', lambda sections, line_name: sections['Vessel Crab Angle'])
+    assert runner.process_file(str(tmp_path / 'missing-EOL_Report.csv')) == {}
+    assert runner.errors[0][1] is None
+    assert runner.results == {}
+    assert isinstance(runner.summary('crab'), pd.DataFrame)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from eol_reader import read_eol_sections
+from eol_schema import apply_schema, column_dtype, read_typed_csv
+
+
+def test_schema():
+    assert column_dtype('Shot #') == 'int32'
+    assert column_dtype('V1 SMA m') == 'float32'
+    assert column_dtype('A2 SP DDC m') == 'float32'
+    assert column_dtype('V1 Easting m') == 'float64'
+    assert column_dtype('Comment') is None
+
+    df = apply_schema(pd.DataFrame({'Shot #': ['1', '', '3'], 'V1 SMA m': ['0.5', 'x', '1.5']}))
+    assert str(df['Shot #'].dtype) == 'Int32'
+    assert df['V1 SMA m'].isna().tolist() == [False, True, False]
+
+
+def test_read_typed_csv_falls_back(tmp_path):
+    path = tmp_path / 'table.csv'
+    path.write_text('Shot #,V1 SMA m\n1,0.5\n2,n/a\n')
+    df = read_typed_csv(str(path))
+    assert df['Shot #'].dtype == np.int32
+    assert df['V1 SMA m'].dtype == np.float32
+    assert df['V1 SMA m'].isna().tolist() == [False, True]
+
+
+def test_sections_typed(report):
+    sections = read_eol_sections(report)
+    assert sections['Vessel Crab Angle']['Shot #'].dtype == np.int32
+    assert sections['Vessel Crab Angle']['V1 Crab °'].dtype == np.float32
+    assert sections['Network Quality']['main DOF'].dtype == np.float32
+    assert sections['Empty Section']['V1 SMA m'].dtype == np.float32
+
+
+def test_read_typed_csv_times(tmp_path):
+    path = tmp_path / 'table.csv'
+    path.write_text('Shot #,Time,V1 SMA m\n1,01/02/2024 10:00:00,0.5\n2,,n/a\n')
+    df = read_typed_csv(str(path))
+    assert pd.api.types.is_datetime64_dtype(df['Time'])
+    assert df['Time'].tolist()[0] == pd.Timestamp('2024-02-01 10:00:00') and pd.isna(df['Time'].tolist()[1])
+    assert read_typed_csv(str(path), parse_time=False)['Time'].tolist()[0] == '01/02/2024 10:00:00'
@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fourd_repeatability
+from fourd_repeatability import BaselineIndex, delta_s, line_repeatability
+from preplot4d_samples import write_4d_preplot
+
+
+def test_stale_sidecar_rebuilt(tmp_path, monkeypatch):
+    path = write_4d_preplot(tmp_path / 'baseline.190')
+    BaselineIndex(path).load()
+    assert os.path.exists(path + '.kdtree')
+
+    # a fresh sidecar is loaded without reading the preplot
+    read = fourd_repeatability.get_4d_preplot_from_file
+    monkeypatch.setattr(fourd_repeatability, 'get_4d_preplot_from_file', None)
+    assert sorted(BaselineIndex(path).load().linename.categories) == ['5007', '5008', '5009']
+
+    # a preplot written again with other lines makes it stale
+    write_4d_preplot(tmp_path / 'baseline.190', [('6001', 1001, 10, 'E')])
+    monkeypatch.setattr(fourd_repeatability, 'get_4d_preplot_from_file', read)
+    index = BaselineIndex(path).load()
+    assert list(index.linename.categories) == ['6001']
+    assert len(index.tree.data) == 10
+    assert list(BaselineIndex(path).load().linename.categories) == ['6001']
+
+
+def test_nearest_beyond_max_distance(tmp_path):
+    index = BaselineIndex(write_4d_preplot(tmp_path / 'baseline.190')).load()
+    # 3 m east of SP 1011 of the northbound line 5007, and nowhere near the survey
+    monitor = pd.DataFrame({'linename': ['M1', 'M1'], 'east': [505010.0, 400000.0], 'north': [3000250.0, 3000000.0]})
+
+    df = delta_s(monitor, index, max_distance=10.0)
+    assert df['baseline_linename'].tolist()[0] == '5007' and pd.isna(df['baseline_linename'].tolist()[1])
+    assert df['baseline_shotpoint'].tolist()[0] == 1011 and df['baseline_shotpoint'].isna().tolist()[1]
+    assert df['dS'].tolist()[0] == pytest.approx(3.0) and np.isnan(df['dS'].tolist()[1])
+    assert np.isnan(df['baseline_east'].tolist()[1])
+
+    summary = line_repeatability(df)
+    assert summary['shots'].tolist() == [2]
+    assert summary['dS_max'].tolist() == pytest.approx([3.0])
+    assert summary['within_5m'].tolist() == [0.5]
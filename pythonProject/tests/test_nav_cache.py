@@ -0,0 +1,134 @@
+import os
+
+import pandas as pd
+import pytest
+
+from nav_cache import ParseCache, cached_parse
+from p190_reader import read_srecords
+
+calls = []
+
+
+@cached_parse(version=1)
+def read_table(file_path):
+    calls.append(file_path)
+    return pd.read_csv(file_path)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'table.csv'
+    path.write_text('a,b\n1,2.5\n3,4.5\n')
+    return str(path)
+
+
+def test_round_trip(parse_cache, source):
+    calls.clear()
+    first = read_table(source)
+    second = read_table(source)
+    pd.testing.assert_frame_equal(first, second)
+    assert calls == [source]
+
+
+def test_changed_source_parsed_again(parse_cache, source):
+    calls.clear()
+    read_table(source)
+    with open(source, 'a') as f:
+        f.write('5,6.5\n')
+    assert len(read_table(source)) == 3
+    assert calls == [source, source]
+
+
+def test_put_lists_cache_only_to_evict(tmp_path, source, monkeypatch):
+    cache = ParseCache(cache_dir=str(tmp_path / 'cache'), max_bytes=10 ** 9)
+    listed = []
+    entries = cache.entries
+    monkeypatch.setattr(cache, 'entries', lambda: listed.append(1) or entries())
+
+    df = pd.read_csv(source)
+    for i in range(20):
+        cache.put(source, 'parser', [i], df)
+    # counted once, the cache never outgrew max_bytes
+    assert len(listed) == 1
+
+    cache.max_bytes = 3 * os.path.getsize(entries()[0][0])
+    cache.put(source, 'parser', [20], df)
+    assert len(entries()) == 3
+    assert cache._size == sum(size for _, size, _ in entries())
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path, source, monkeypatch):
+    cache = ParseCache(cache_dir=str(tmp_path / 'cache'))
+
+    def disk_full(self, path, **kwargs):
+        with open(path, 'wb') as f:
+            f.write(b'partial')
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(pd.DataFrame, 'to_parquet', disk_full)
+    cache.put(source, 'parser', [], pd.read_csv(source))
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_unwritable_cache_does_not_fail_parse(tmp_path, source, parse_cache):
+    # the cache directory would be below a file, it cannot be created
+    blocker = tmp_path / 'blocker'
+    blocker.write_text('')
+    parse_cache.cache_dir = str(blocker / 'cache')
+
+    calls.clear()
+    assert len(read_table(source)) == 2
+    assert len(read_table(source)) == 2
+    assert calls == [source, source]
+
+
+def test_entry_evicted_by_another_process(parse_cache, source, monkeypatch):
+    read_table(source)
+    read_parquet = pd.read_parquet
+
+    def read_then_evict(path, *args, **kwargs):
+        df = read_parquet(path, *args, **kwargs)
+        os.remove(path)
+        return df
+
+    monkeypatch.setattr(pd, 'read_parquet', read_then_evict)
+    calls.clear()
+    # the entry vanished before it was touched, it is treated as a miss
+    assert parse_cache.get(source, 'missing', []) is None
+    assert len(read_table(source)) == 2
+    monkeypatch.undo()
+    assert parse_cache.entries() and all(os.path.exists(path) for path, _, _ in parse_cache.entries())
+
+
+def test_entries_skip_vanished(parse_cache, source, monkeypatch):
+    read_table(source)
+    scandir = os.scandir
+
+    class Vanished:
+        name = 'gone.parquet'
+        path = 'gone.parquet'
+
+        def stat(self):
+            raise FileNotFoundError(self.path)
+
+    class Listing:
+        def __init__(self, path):
+            self.it = scandir(path)
+
+        def __enter__(self):
+            return [Vanished()] + list(self.it)
+
+        def __exit__(self, *exc):
+            self.it.close()
+
+    monkeypatch.setattr(os, 'scandir', Listing)
+    assert len(parse_cache.entries()) == 1
+    parse_cache.clear()
+    monkeypatch.undo()
+    assert parse_cache.entries() == []
+
+
+def test_read_srecords_cached(p190, parse_cache):
+    first = read_srecords(p190)
+    assert len(parse_cache.entries()) == 1
+    pd.testing.assert_frame_equal(read_srecords(p190), first)
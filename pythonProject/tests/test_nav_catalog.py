@@ -0,0 +1,66 @@
+import os
+import shutil
+
+import pytest
+
+from nav_catalog import NavCatalog
+
+
+def touch(path, text='x'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+@pytest.fixture
+def nav_tree(tmp_path):
+    root = tmp_path / '00_NAV'
+    for seq in (1001, 1002):
+        folder = root / f'Seq{seq}' / 'PP_SP_Range'
+        touch(str(folder / f'539112{seq}-EOL_Report.csv'))
+        touch(str(folder / f'539112{seq}-SMA_QC.csv'))
+        touch(str(root / f'Seq{seq}' / f'539112{seq}-SourceDrift.csv'))
+    touch(str(root / 'Seq1001' / 'notes.txt'))
+    return root
+
+
+def catalog(tree, tmp_path):
+    return NavCatalog(str(tree), catalog_path=str(tmp_path / 'catalog.pkl'))
+
+
+def test_files(nav_tree, tmp_path):
+    files = catalog(nav_tree, tmp_path).scan().files()
+    assert sorted(files['product'].unique()) == ['EOL_Report', 'SMA_QC', 'SourceDrift']
+    assert len(files) == 6
+
+    sma = catalog(nav_tree, tmp_path).files('SMA_QC', sequences=[1002], subfolder='PP_SP_Range')
+    assert sma['line'].tolist() == ['5391121002']
+    assert sma['path'].tolist() == [str(nav_tree / 'Seq1002' / 'PP_SP_Range' / '5391121002-SMA_QC.csv')]
+
+
+def test_saved_catalog_reused_and_updated(nav_tree, tmp_path, monkeypatch):
+    catalog(nav_tree, tmp_path).scan()
+
+    # nothing changed, no directory is listed again
+    listed = []
+    monkeypatch.setattr(NavCatalog, '_list', lambda self, path, *args: listed.append(path))
+    assert len(catalog(nav_tree, tmp_path).scan().files()) == 6
+    assert listed == []
+    monkeypatch.undo()
+
+    touch(str(nav_tree / 'Seq1003' / 'PP_SP_Range' / '5391121003-EOL_Report.csv'))
+    assert catalog(nav_tree, tmp_path).scan().paths('EOL_Report', sequences=[1003]) == [
+        str(nav_tree / 'Seq1003' / 'PP_SP_Range' / '5391121003-EOL_Report.csv')]
+
+
+def test_removed_directory_dropped(nav_tree, tmp_path):
+    catalog(nav_tree, tmp_path).scan()
+
+    # a sequence folder removed while the root keeps its mtime, as seen on some shares
+    root_stat = os.stat(nav_tree)
+    shutil.rmtree(nav_tree / 'Seq1002')
+    os.utime(nav_tree, ns=(root_stat.st_atime_ns, root_stat.st_mtime_ns))
+
+    files = catalog(nav_tree, tmp_path).scan().files()
+    assert files['sequence'].unique().tolist() == [1001]
+    assert len(files) == 3
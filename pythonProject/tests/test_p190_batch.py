@@ -0,0 +1,29 @@
+from p190_reader import read_srecords_batch
+from p190_samples import position_record, write_p190
+
+
+def test_read_srecords_batch(tmp_path):
+    files = [write_p190(tmp_path / f'{name}.p190') for name in ('a', 'b')]
+    shots, timing = read_srecords_batch(files, workers=1)
+    assert len(shots) == 2 * 75
+    assert timing['records'].tolist() == [75, 75]
+    # shots of all files ordered by day and time of day
+    order = list(zip(shots['jday'], shots['time']))
+    assert order == sorted(order)
+
+
+def test_line_names_of_all_files_kept(tmp_path):
+    other = tmp_path / 'other.p190'
+    other.write_text('\n'.join(position_record('S', '5391122001', sp, 10 + i) for i, sp in enumerate(range(5001, 5004)))
+                     + '\n')
+    files = [write_p190(tmp_path / 'a.p190'), str(other)]
+    shots, _ = read_srecords_batch(files, workers=1)
+    # categories of the files are unioned, not lost to object dtype in the concat
+    assert list(shots['linename'].cat.categories) == ['5391121001', '5391121002', '5391122001']
+    assert (shots['linename'] == '5391122001').sum() == 3
+
+
+def test_no_files(tmp_path):
+    shots, timing = read_srecords_batch(str(tmp_path / '*.p190'), workers=1)
+    assert shots.empty and list(shots.columns)[:2] == ['linename', 'sp']
+    assert timing.empty
@@ -0,0 +1,38 @@
+from p190_reader import P190File
+from p190_samples import assert_matches_reference, position_record, receiver_record, reference_srecords
+
+
+def test_p190_file_tables(p190):
+    f = P190File(p190)
+    assert f.record_types() == {'H': 1, 'R': 75, 'S': 75, 'V': 75}
+    assert f.headers['value'].tolist() == ['Gulf of Mexico']
+    assert_matches_reference(f.shots.drop(columns=['vessel_id', 'source_id', 'other_id']),
+                             reference_srecords(p190))
+    assert f.vessels['sp'].tolist() == f.shots['sp'].tolist()
+
+    # R records come before the S record of their shot
+    receivers = f.receivers
+    assert len(receivers) == 3 * 75
+    first_shot = receivers[(receivers['linename'] == '5391121002') & (receivers['sp'] == 2001)]
+    assert first_shot['group'].tolist() == [1, 2, 3]
+    assert first_shot['east'].tolist() == [600000 + 40 + g for g in (1, 2, 3)]
+
+
+def test_receivers_after_shot(tmp_path):
+    path = tmp_path / 'after.p190'
+    records = []
+    for i, sp in enumerate(range(1001, 1004)):
+        records += [position_record('S', '5391121001', sp, i), receiver_record(i, streamer='2')]
+    path.write_text('\n'.join(records) + '\n')
+
+    receivers = P190File(str(path), receivers_before_shot=False).receivers
+    assert receivers['sp'].tolist() == [1001] * 3 + [1002] * 3 + [1003] * 3
+    assert receivers['east'].tolist()[3:6] == [600000 + 1 + g for g in (1, 2, 3)]
+    assert receivers['streamer'].astype(str).unique().tolist() == ['2']
+
+
+def test_tables_decoded_on_first_access(p190):
+    f = P190File(p190)
+    assert f._tables == {}
+    f.shots
+    assert list(f._tables) == ['S']
@@ -0,0 +1,34 @@
+from p190_index import P190Index
+from p190_samples import LINES, assert_matches_reference, position_record, reference_srecords, write_p190
+
+
+def test_p190_index_query(p190):
+    reference = reference_srecords(p190)
+    with P190Index(p190) as index:
+        blocks = index.load()
+        assert blocks['records'].tolist() == [count for _, _, count in LINES]
+        assert index.lines().loc['5391121001', 'records'] == 50
+
+        df = index.query('5391121001', 1010, 1045)
+        expected = reference[(reference['linename'] == '5391121001') & reference['sp'].between(1010, 1045)]
+        assert_matches_reference(df, expected.reset_index(drop=True))
+        assert len(index.query('5391121002', 9000)) == 0
+
+    # a second index is loaded from the sidecar file without scanning the source
+    with P190Index(p190) as index:
+        index.build = None
+        assert index.load()['records'].tolist() == [count for _, _, count in LINES]
+
+
+def test_stale_index_rebuilt(tmp_path):
+    path = write_p190(tmp_path / 'growing.p190')
+    with P190Index(path) as index:
+        index.load()
+
+    # the acquisition appended a line, the sidecar's size and mtime no longer match
+    with open(path, 'a') as f:
+        for i, sp in enumerate(range(3001, 3006)):
+            f.write(position_record('S', '5391121003', sp, 100 + i) + '\n')
+    with P190Index(path) as index:
+        assert index.lines().loc['5391121003'].tolist() == [3001, 3005, 5]
+        assert index.query('5391121003', 3004)['sp'].tolist() == [3004, 3005]
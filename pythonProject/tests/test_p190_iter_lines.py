@@ -0,0 +1,24 @@
+import pandas as pd
+
+from boem_reporter import daily_shot_time, shot_time_by_day, srecords_to_df
+from p190_reader import iter_chunks, iter_lines
+from p190_samples import LINES, assert_matches_reference, reference_srecords
+
+
+def test_iter_lines_yields_line_blocks(p190):
+    # a chunk smaller than a line block splits every line over several chunks
+    blocks = list(iter_lines(p190, chunk_size=1000))
+    assert [(str(df['linename'].iloc[0]), len(df)) for df in blocks] == [(line, count) for line, _, count in LINES]
+
+    reference = reference_srecords(p190)
+    assert_matches_reference(pd.concat([df.assign(linename=df['linename'].astype(str)) for df in blocks],
+                                       ignore_index=True), reference)
+    assert sum(len(df) for df in iter_chunks(p190, chunk_size=1000)) == len(reference)
+
+
+def test_daily_shot_time_streamed(p190):
+    # streamed over small chunks, the per day totals equal those of the whole file at once
+    streamed = daily_shot_time([p190], chunk_size=1000)
+    whole = shot_time_by_day(srecords_to_df(p190))
+    assert streamed['jday'].tolist() == whole.index.tolist()
+    assert streamed['total shot time'].tolist() == whole.tolist()
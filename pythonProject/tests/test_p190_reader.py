@@ -0,0 +1,12 @@
+import numpy as np
+import pandas as pd
+
+from p190_reader import read_srecords
+from p190_samples import assert_matches_reference, reference_srecords
+
+
+def test_read_srecords_matches_reference(p190):
+    df = read_srecords(p190)
+    assert df['sp'].dtype == np.int32
+    assert isinstance(df['linename'].dtype, pd.CategoricalDtype)
+    assert_matches_reference(df, reference_srecords(p190))
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from p190_index import P190Index
+from p190_samples import dms
+from preplot4d_samples import LINES, write_4d_preplot
+from preplot4d_to_df import FOURD_PREPLOT_FIELDS, decode_4d_records, get_4d_preplot_endpoints, get_4d_preplot_from_file
+
+def baseline_endpoints(fourd_preplot_df):
+    """The grouped iloc loop get_4d_preplot_endpoints replaced, as reference."""
+    df = fourd_preplot_df.sort_values(by=['linename', 'shotpoint'])
+    rows = []
+    for preplot_line, group in df.groupby('linename', observed=True):
+        first, last = group.iloc[0], group.iloc[-1]
+        delta_east = last['easting'] - first['easting']
+        delta_north = last['northing'] - first['northing']
+        rows.append({'linename': preplot_line, 'sp1': first['shotpoint'], 'east1': first['easting'],
+                     'north1': first['northing'], 'lat1_deg': first['latitude'], 'lon1_deg': first['longitude'],
+                     'sp2': last['shotpoint'], 'east2': last['easting'], 'north2': last['northing'],
+                     'lat2_deg': last['latitude'], 'lon2_deg': last['longitude'],
+                     'length': np.sqrt(delta_east ** 2 + delta_north ** 2),
+                     'azimuth': np.degrees(np.arctan2(delta_east, delta_north)) % 360})
+    return pd.DataFrame(rows)
+
+
+def assert_same_endpoints(df, reference):
+    df = df.assign(linename=df['linename'].astype(str))
+    reference = reference.assign(linename=reference['linename'].astype(str))
+    pd.testing.assert_frame_equal(df, reference, check_dtype=False)
+
+
+def test_endpoints_match_baseline(tmp_path):
+    df = get_4d_preplot_from_file(write_4d_preplot(tmp_path / 'kms4d.190'))
+    endpoints = get_4d_preplot_endpoints(df)
+    assert_same_endpoints(endpoints, baseline_endpoints(df))
+    assert endpoints['azimuth'].round(6).tolist() == [0.0, 90.0, 45.0]
+
+
+def test_endpoints_of_joined_preplots(tmp_path):
+    # two preplots joined with concat repeat their index labels
+    first = get_4d_preplot_from_file(write_4d_preplot(tmp_path / 'a.190', LINES[:2]))
+    second = get_4d_preplot_from_file(write_4d_preplot(tmp_path / 'b.190', LINES[2:]))
+    df = pd.concat([first, second.iloc[::-1]])
+    df['linename'] = df['linename'].astype(str)
+    assert not df.index.is_unique
+
+    assert_same_endpoints(get_4d_preplot_endpoints(df), baseline_endpoints(df))
+
+
+def reference_4d_preplot(file_path):
+    """Per line string slicing, as get_4d_preplot_from_file did before the byte reader."""
+    rows = []
+    with open(file_path, 'r') as f:
+        for line in f:
+            if not line.startswith('S'):
+                continue
+            latitude = int(line[25:27]) + int(line[27:29]) / 60 + float(line[29:34]) / 3600
+            longitude = int(line[35:38]) + int(line[38:40]) / 60 + float(line[40:45]) / 3600
+            rows.append({'linename': line[1:5], 'shotpoint': int(line[21:25].strip()),
+                         'latitude': -latitude if line[34] == 'S' else latitude,
+                         'longitude': -longitude if line[45] == 'W' else longitude,
+                         'easting': float(line[47:55].strip()), 'northing': float(line[55:64].strip())})
+    return pd.DataFrame(rows)
+
+
+def test_preplot_matches_reference(tmp_path):
+    path = write_4d_preplot(tmp_path / 'kms4d.190')
+    df = get_4d_preplot_from_file(path)
+    assert df['shotpoint'].dtype == np.int32
+    assert isinstance(df['linename'].dtype, pd.CategoricalDtype)
+    assert (df['longitude'] < 0).all() and (df['latitude'] > 0).all()
+
+    reference = reference_4d_preplot(path)
+    pd.testing.assert_frame_equal(df.assign(linename=df['linename'].astype(str)), reference,
+                                  check_dtype=False, check_exact=False, rtol=0, atol=1e-9)
+
+
+def test_southern_and_eastern_hemispheres(tmp_path):
+    path = tmp_path / 'south.190'
+    record = f'S{"6001":<4}{"":16}{1001:>4}{dms(-12.5, 2, "NS")}{dms(45.25, 3, "EW")} {500000.0:8.1f}{8600000.0:9.1f}'
+    path.write_text(f'{record:<80}\n')
+    df = get_4d_preplot_from_file(str(path))
+    assert df[['latitude', 'longitude']].values.round(9).tolist() == [[-12.5, 45.25]]
+    pd.testing.assert_frame_equal(df.assign(linename=df['linename'].astype(str)), reference_4d_preplot(str(path)),
+                                  check_dtype=False)
+
+
+def test_p190_index_over_4d_preplot(tmp_path):
+    path = write_4d_preplot(tmp_path / 'kms4d.190')
+    reference = reference_4d_preplot(path)
+    with P190Index(path, fields=FOURD_PREPLOT_FIELDS, decoder=decode_4d_records, sp_field='shotpoint') as index:
+        blocks = index.load()
+        assert blocks['linename'].tolist() == ['5007', '5008', '5009']
+        assert blocks[['first_sp', 'last_sp', 'records']].values.tolist() == [[1001, 1030, 30], [2001, 2020, 20],
+                                                                               [3001, 3025, 25]]
+        df = index.query('5008', 2005, 2010)
+        expected = reference[(reference['linename'] == '5008') & reference['shotpoint'].between(2005, 2010)]
+        pd.testing.assert_frame_equal(df.assign(linename=df['linename'].astype(str)), expected.reset_index(drop=True),
+                                      check_dtype=False, check_exact=False, rtol=0, atol=1e-9)
@@ -0,0 +1,117 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from crs_registry import UTM15N_WGS84, get_transformer
+from preplot_to_csv import PreplotToCsv
+
+SPI = 16.666666666667
+
+# linename, first SP, start easting/northing, azimuth and length in m
+LINES = [
+    ('KMS1001', 10001, 500000.0, 3000000.0, 0.0, 500.0),
+    ('KMS1002', 20001, 501000.0, 3000000.0, 90.0, 401.3),
+    ('KMS1003', 30001, 502000.0, 3001000.0, 210.0, 333.4),
+    ('KMS1004', 40001, 503000.0, 3000000.0, 300.0, 250.0),
+]
+
+
+def v_record(line, sp, east, north):
+    record = f'V{line:<12}{"":7}{sp:>5}{"274500.00N":>10}{"0901500.00W":>11} {east:8.1f}{north:9.1f}'
+    return f'{record:<80}'
+
+
+def write_preplot(path):
+    records = []
+    for line, first_sp, east, north, azimuth, length in LINES:
+        # shots at the SPI, the last one at the end of the line
+        distances = list(np.arange(0, length, SPI)) + [length]
+        a = math.radians(azimuth)
+        for i, d in enumerate(distances):
+            records.append(v_record(line, first_sp + i, east + d * math.sin(a), north + d * math.cos(a)))
+    path.write_text('\n'.join(records) + '\n')
+    return str(path)
+
+
+def reference_endpoints(file_path):
+    """The string split and per-row geometry get_preplot_coordinates used before, as reference."""
+    ends = {}
+    with open(file_path, 'r') as f:
+        for line in f:
+            if line[0] == 'V':
+                fields = line.split()
+                point = {'sp': int(fields[1][0:5]), 'east': float(fields[2][0:8]), 'north': float(fields[2][8:])}
+                ends.setdefault(fields[0][1:], [point, point])[1] = point
+
+    def azimuth(dx, dy):
+        # the old quadrant ladder, with south-west lines in their own quadrant as fixed by arctan2
+        if dx > 0:
+            return 90.0 if dy == 0 else round(90 - math.degrees(math.atan(dy / dx)), 3)
+        if dx < 0 and dy < 0:
+            return round(270 - math.degrees(math.atan(dy / dx)), 3)
+        if dx < 0:
+            return 270.0 if dy == 0 else round(270 + math.degrees(math.atan(dy / -dx)), 3)
+        return 0.0 if dy > 0 else 180.0
+
+    rows = []
+    for name, (first, last) in ends.items():
+        dE = round(round(last['east'], 3) - round(first['east'], 3), 3)
+        dN = round(round(last['north'], 3) - round(first['north'], 3), 3)
+        rows.append({'linename': name, 'sp1': first['sp'], 'east1': first['east'], 'north1': first['north'],
+                     'sp2': last['sp'], 'east2': last['east'], 'north2': last['north'],
+                     'dE': dE, 'dN': dN, 'Az': azimuth(dE, dN), 'length': (dE ** 2 + dN ** 2) ** 0.5})
+    return pd.DataFrame(rows)
+
+
+def reference_shots(endpoints, spi=SPI):
+    """The per shot loop get_preplot_shots replaced, one transform per shot, as reference."""
+    transformer = get_transformer(UTM15N_WGS84)
+    shots = {}
+    for _, row in endpoints.iterrows():
+        a = float(row['Az'])
+        rows = []
+        for i in range(round(int(row['length']) / spi) + 1):
+            d = spi * i
+            e = float(row['east1']) + d * math.sin(math.radians(a))
+            n = float(row['north1']) + d * math.cos(math.radians(a))
+            lon, lat = transformer.transform(e, n)
+            rows.append([int(row['sp1']) + i, e, n, lat, lon])
+        shots[row['linename']] = pd.DataFrame(rows, columns=['sp', 'east', 'north', 'lat', 'lon'])
+    return shots
+
+
+def test_endpoints_match_reference(tmp_path):
+    path = write_preplot(tmp_path / 'preplot.p190')
+    df = PreplotToCsv(path).get_preplot_coordinates()
+    reference = reference_endpoints(path)
+    pd.testing.assert_frame_equal(df[reference.columns], reference, check_dtype=False)
+    assert df['Az'].round(1).tolist() == [0.0, 90.0, 210.0, 300.0]
+    assert np.allclose(df['length'], [length for *_, length in LINES], atol=0.1)
+
+
+def test_endpoints_numeric(tmp_path):
+    df = PreplotToCsv(write_preplot(tmp_path / 'preplot.p190')).get_preplot_coordinates()
+    for name in ('sp1', 'sp2', 'east1', 'north2', 'lat1', 'lon2', 'Az', 'length'):
+        assert pd.api.types.is_numeric_dtype(df[name]), name
+    assert (df['lon1'] < 0).all() and (df['lat1'] > 0).all()
+
+
+def test_preplot_shots_match_reference(tmp_path):
+    preplot = PreplotToCsv(write_preplot(tmp_path / 'preplot.p190'))
+    shots = preplot.get_preplot_shots()
+    reference = reference_shots(preplot.get_preplot_coordinates())
+    assert list(shots) == list(reference)
+    for line, df in shots.items():
+        # every line is a table of its own, written to CSV with a 0 based index
+        pd.testing.assert_frame_equal(df, reference[line], check_dtype=False, check_exact=False, rtol=0, atol=1e-6)
+
+
+def test_preplot_shot_table(tmp_path):
+    preplot = PreplotToCsv(write_preplot(tmp_path / 'preplot.p190'))
+    table = preplot.get_preplot_shot_table()
+    shots = preplot.get_preplot_shots()
+    assert len(table) == sum(len(df) for df in shots.values())
+    north = table[table['linename'] == 'KMS1001']
+    assert np.allclose(north['north'].diff().dropna(), SPI)
+    assert table['lat'].between(27, 28).all() and table['lon'].between(-94, -92).all()
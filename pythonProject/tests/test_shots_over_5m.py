@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from shots_over_5m import SOURCE_DRIFT_COLUMNS, find_shots_over_threshold, read_source_drift, sniff_encoding
+
+
+def write_source_drift(path, rows, preamble=b'Line,5391121074\r\nComment,\xc2\xb0 drift\r\n', dda=b'0'):
+    lines = [preamble + ','.join(SOURCE_DRIFT_COLUMNS).encode() + b'\r\n', b',,m,m,m,m,m,m,m,m,m\r\n']
+    for shot, ddc in rows:
+        lines.append(f'{shot},01/01/2024 00:00:{shot % 60:02d},'.encode() + dda + f',0,0,0,{ddc},0,0,0,0\r\n'.encode())
+    path.write_bytes(b''.join(lines) + b'\r\nSummary,\r\n')
+    return str(path)
+
+
+def test_sniff_encoding():
+    assert sniff_encoding('Comment,° drift'.encode('utf-8')) == 'utf-8'
+    assert sniff_encoding('Comment,° drift'.encode('latin1')) == 'latin1'
+
+
+def test_shots_over_threshold(tmp_path):
+    file_path = write_source_drift(tmp_path / '5391121074-SourceDrift.csv', [(1001, 1.0), (1002, -6.5), (1003, 5.5)])
+
+    over = find_shots_over_threshold(file_path)
+    assert over['Shot #'].tolist() == [1002, 1003]
+    assert over['A2 SP DDC m'].tolist() == pytest.approx([-6.5, 5.5])
+
+
+def test_latin1_byte_after_sniffed_prefix(tmp_path):
+    # the first 64 KiB are utf-8, a latin1 byte comes later in the block
+    rows = [(shot, 6.0 if shot == 1500 else 0.0) for shot in range(1, 4001)]
+    file_path = write_source_drift(tmp_path / 'drift-SourceDrift.csv', rows)
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    with open(file_path, 'wb') as f:
+        f.write(data[:-200] + b'\xb0' + data[-199:])
+    assert sniff_encoding(data[:64 * 1024]) == 'utf-8' and len(data) > 64 * 1024
+
+    df = read_source_drift(file_path)
+    assert len(df) == 4000
+    assert find_shots_over_threshold(file_path)['Shot #'].tolist() == [1500]
+
+
+def test_missing_header_raises(tmp_path):
+    file_path = tmp_path / 'empty-SourceDrift.csv'
+    file_path.write_bytes(b'Line,5391121074\r\n\r\n')
+    with pytest.raises(ValueError):
+        find_shots_over_threshold(str(file_path))
+
+
+def test_known_files_not_searched_for(tmp_path, monkeypatch):
+    import shots_over_5m
+
+    def no_search(*args, **kwargs):
+        raise AssertionError('the tree was searched')
+
+    monkeypatch.setattr(shots_over_5m, 'find_product_files', no_search)
+    good = write_source_drift(tmp_path / '5391121074-SourceDrift.csv', [(1001, 1.0)])
+    bad = tmp_path / '5391121075-SourceDrift.csv'
+    bad.write_bytes(b'Line,5391121075\r\n')
+
+    errors = shots_over_5m.process_sequence_source_drift(str(tmp_path), '1074', file_paths=[good, str(bad)])
+    assert [path for path, _ in errors] == [str(bad)]
+
+
+def test_source_drift_typed(tmp_path):
+    file_path = write_source_drift(tmp_path / '5391121074-SourceDrift.csv', [(1001, 1.0), (1002, -6.5)])
+    df = read_source_drift(file_path)
+    assert df['Shot #'].dtype == np.int32
+    assert df['A2 SP DDC m'].dtype == np.float32
+    assert df['Time'].tolist() == [pd.Timestamp('2024-01-01 00:00:41'), pd.Timestamp('2024-01-01 00:00:42')]
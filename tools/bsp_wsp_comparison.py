@@ -1,10 +1,17 @@
 import os
+import sys
 
+# shared navigation readers live in pythonProject
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pythonProject'))
 
 os.environ['TCL_LIBRARY'] = r'C:\Users\mta3.sv1.nav\AppData\Local\Programs\Python\Python312\tcl\tcl8.6'
 os.environ['TK_LIBRARY'] = r'C:\Users\mta3.sv1.nav\AppData\Local\Programs\Python\Python312\tcl\tk8.6'
 import tkinter
 
+from eol_schema import read_typed_csv
+from nav_cache import cached_parse
+from nav_catalog import find_product_files
+
 def datestdtojd(col):
 
     sdtdate = col.timetuple()
@@ -18,8 +25,10 @@ def time_to_datetime(col):
     return datetime.strptime(col, '%d/%m/%Y %H:%M:%S')
 
 
+@cached_parse(version=2)
 def eolreport_to_df(f):
-    df = pd.read_csv(f, sep=',', skiprows=[0, 1, 2, 3, 5], encoding='ISO-8859-1')
+    # measurements come back float32 and Time as datetime, as registered in eol_schema
+    df = read_typed_csv(f, sep=',', skiprows=[0, 1, 2, 3, 5], encoding='ISO-8859-1')
     # print(df.columns)
     return df
 
@@ -189,22 +198,11 @@ if __name__ == '__main__':
     root_dir = r'Z:\MT3007424\Murphy_KMS_3D_OBN\00_NAV'
 
     production_lines = list()
-    # Iterate through the range of folder names
-    for i in range(1060, 1135):  # 5370 is used because the range is exclusive at the end
-        folder_name = f'Seq{i}'
-        folder_path = os.path.join(root_dir, folder_name)
-
-        if os.path.isdir(folder_path):  # Check if the folder exists
-            pp_sp_path = os.path.join(folder_path, 'PP_SP_Range')
-            if os.path.isdir(pp_sp_path):
-                # print(pp_sp_path)
-                for dirpath, dirnames, filenames in os.walk(pp_sp_path):
-                    for filename in filenames:
-                        if filename.endswith('AAT_Shot_Table.csv'):
-                            file_path = os.path.join(dirpath, filename)
-                            if file_path[-29] not in ['7']:
-                                production_lines.append(file_path)
-                                print(file_path)
+    # Seq{i}/PP_SP_Range shot tables of the sequences in range, from the saved catalog of root_dir
+    for file_path in find_product_files(root_dir, 'AAT_Shot_Table', range(1060, 1135), 'PP_SP_Range'):
+        if file_path[-29] not in ['7']:
+            production_lines.append(file_path)
+            print(file_path)
 
     # UNCOMMENT IF YOU WANT TO MAKE NEW GRAPHS
     for eol_csv in production_lines:
@@ -1,9 +1,15 @@
-import pandas as pd
 from sqlalchemy import create_engine, Column, Integer, Float, String, MetaData, Table, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 import re
 import os
+import sys
+
+# shared navigation readers live in pythonProject
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pythonProject'))
+
+from eol_reader import combine_sections, read_eol_sections
+from nav_catalog import find_product_files
 
 
 # Dynamically create DetailTable with columns from combined_df
@@ -32,78 +38,11 @@ def create_detail_table(metadata, combined_df):
 
 def parse_eol_sections(file_path: str) -> dict:
 
-    sections = {}
-    current_section = None
-    current_headers = None
-    current_data = []
-
-    with open(file_path, 'r') as f:
-        # Skip first line (EOL_Report)
-        next(f)
-
-        # Skip initial empty line if present
-        line = next(f).strip()
-        if not line:
-            line = next(f).strip()
-
-        while True:
-            try:
-                # New section starts with title
-                if current_section is None:
-                    current_section = line
-
-                    # Skip empty line after title
-                    next(f)
-
-                    # Get headers
-                    current_headers = next(f).strip().split(',')
-
-                    # Skip empty line after headers
-                    next(f)
-
-                    # Start reading data
-                    line = next(f).strip()
-                    current_data = []
-                    continue
-
-                # Empty line marks end of current section
-                if not line:
-                    # Convert collected data to DataFrame
-                    df = pd.DataFrame(current_data, columns=current_headers)
-
-                    # Convert Time column to datetime if it exists
-                    if 'Time' in df.columns:
-                        df['Time'] = pd.to_datetime(df['Time'], format='%d/%m/%Y %H:%M:%S')
-
-                    sections[current_section] = df
-                    current_section = None
-                    current_data = []
-                    line = next(f).strip()
-                    continue
-
-                # Add data row to current section
-                current_data.append(line.split(','))
-                line = next(f).strip()
-
-            except StopIteration:
-                # Convert last section if exists
-                if current_section and current_data:
-                    df = pd.DataFrame(current_data, columns=current_headers)
-                    if 'Time' in df.columns:
-                        df['Time'] = pd.to_datetime(df['Time'], format='%d/%m/%Y %H:%M:%S')
-                    sections[current_section] = df
-                break
-
-        combined_df = None
-
-        for key, df in sections.items():
-            if combined_df is None:
-                combined_df = df
-            else:
-                combined_df = pd.merge(combined_df, df, on=["Shot #", "Time"], how="outer")
-
-        # Fill NaN if needed, e.g., with 0 or a placeholder value
-        combined_df = combined_df.fillna(0)
+    # every section read in one pass over the file, see eol_reader
+    sections = read_eol_sections(file_path)
+
+    # one row per shot, shots missing from a section get 0 in its numeric columns
+    combined_df = combine_sections(sections, fill_value=0)
 
     return combined_df
 
@@ -129,22 +68,11 @@ def make_columns_sql_ready(df):
 def find_files(start_seq, end_seq, root_dir):
 
     production_lines = list()
-    # Iterate through the range of folder names
-    for i in range(start_seq, end_seq):
-        folder_name = f'Seq{i}'
-        folder_path = os.path.join(root_dir, folder_name)
-
-        if os.path.isdir(folder_path):  # Check if the folder exists
-            pp_sp_path = os.path.join(folder_path, 'PP_SP_Range')
-            if os.path.isdir(pp_sp_path):
-                # print(pp_sp_path)
-                for dirpath, dirnames, filenames in os.walk(pp_sp_path):
-                    for filename in filenames:
-                        if filename.endswith('-EOL_Report.csv'):
-                            file_path = os.path.join(dirpath, filename)
-                            if file_path[-29] not in ['7']:
-                                production_lines.append(file_path)
-                                # print(file_path)
+    # Seq{i}/PP_SP_Range files of the sequences in range, from the saved catalog of root_dir
+    for file_path in find_product_files(root_dir, 'EOL_Report', range(start_seq, end_seq), 'PP_SP_Range'):
+        if file_path[-29] not in ['7']:
+            production_lines.append(file_path)
+            # print(file_path)
 
     return production_lines
 
@@ -0,0 +1,196 @@
+import sys
+import os
+
+# shared navigation readers live in pythonProject
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pythonProject'))
+
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import pandas as pd
+
+from eol_runner import survey_runner
+from get_high_sma import line_average_sma
+from nav_catalog import NavCatalog
+from shots_over_5m import process_sequence_source_drift
+
+
+class NavWatcher:
+    """
+    Watch a 00_NAV tree and run the analyses of every product file that lands in it.
+
+    The tree is polled through a NavCatalog, so an idle poll costs one stat per
+    directory and nothing is read or written. A new or changed file is only
+    handed to its analyses once its size and mtime have stayed the same for
+    settle seconds, so a report still being copied is not read half written.
+    Files processed in the last recent seconds are also checked directly,
+    which catches a report rewritten in place without touching its directory.
+    """
+
+    def __init__(self, root_folder, poll_interval=2.0, settle=5.0, recent=3600.0, process_existing=False,
+                 catalog=None):
+        """
+        Args:
+            root_folder (str): 00_NAV tree to watch
+            poll_interval (float): seconds between polls
+            settle (float): seconds a file must stay unchanged before it is processed
+            recent (float): processed files are checked for rewrites for this long
+            process_existing (bool): also process the files already there at the first poll
+            catalog (NavCatalog): catalog of root_folder, the saved one by default
+        """
+        self.root_folder = root_folder
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self.recent = recent
+        self.process_existing = process_existing
+        self.catalog = catalog or NavCatalog(root_folder)
+
+        self.handlers = {}
+        self.errors = []
+        # processed files with their settled stat, last catalog listing and time of processing
+        self._done = {}
+        # files waiting to settle with their last stat and since when it is unchanged
+        self._pending = {}
+        self._started = False
+
+    def register(self, product, name, handler):
+        """
+        Run handler(file_path, line_name, sequence) for every settled file of product, see PRODUCT_SUFFIXES.
+
+        line_name and sequence are those of the file in the NavCatalog, sequence is
+        None for a file that is not in a sequence folder.
+
+        A handler reports a failure by raising or by returning an error message.
+        """
+        self.handlers.setdefault(product, []).append((name, handler))
+        return self
+
+    @staticmethod
+    def _stat(path):
+        """mtime and size of a file, None when it is gone."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime, stat.st_size
+
+    def _candidates(self, now):
+        files = self.catalog.scan().files()
+        files = files[files['product'].isin(list(self.handlers))]
+        listed = dict(zip(files['path'], zip(files['mtime'], files['size'])))
+
+        if not self._started:
+            self._started = True
+            if not self.process_existing:
+                for path, record in listed.items():
+                    self._done[path] = {'stat': self._stat(path), 'listed': record, 'at': 0.0}
+                return [], files, listed
+
+        candidates = []
+        for path, record in listed.items():
+            done = self._done.get(path)
+            if done is None:
+                candidates.append(path)
+            elif done['listed'] != record or now - done['at'] < self.recent:
+                # the directory was listed again, or the file was processed recently and may be
+                # rewritten in place. The listing can be from mid-write, so it only triggers a
+                # check of the file against its settled stat when processed
+                done['listed'] = record
+                if self._stat(path) != done['stat']:
+                    candidates.append(path)
+        return candidates, files, listed
+
+    def _run_handlers(self, path, product, line_name, sequence):
+        for name, handler in self.handlers.get(product, []):
+            try:
+                error = handler(path, line_name, sequence)
+            except Exception as e:
+                error = str(e)
+            if error is not None:
+                print(f"Error in {name} for {path}: {error}")
+                self.errors.append((path, name, error))
+
+    def poll(self, now=None):
+        """
+        One poll of the tree, runs the analyses of the files that settled since the last one.
+
+        Returns:
+            list: paths processed in this poll
+        """
+        now = time.time() if now is None else now
+        candidates, files, listed = self._candidates(now)
+        # the sequence column is float when some file has none
+        sequences = [None if pd.isna(sequence) else int(sequence) for sequence in files['sequence']]
+        products = dict(zip(files['path'], zip(files['product'], files['line'], sequences)))
+
+        for path in candidates:
+            if path not in self._pending:
+                self._pending[path] = {'stat': None, 'since': now}
+
+        processed = []
+        for path, state in list(self._pending.items()):
+            stat = self._stat(path)
+            if stat is None:
+                del self._pending[path]
+                continue
+            if stat != state['stat']:
+                state.update(stat=stat, since=now)
+                continue
+            if now - state['since'] < self.settle or path not in products:
+                continue
+
+            del self._pending[path]
+            self._done[path] = {'stat': state['stat'], 'listed': listed[path], 'at': now}
+            product, line_name, sequence = products[path]
+            self._run_handlers(path, product, line_name, sequence)
+            processed.append(path)
+        return processed
+
+    def run(self):
+        """Poll forever, printing every processed file."""
+        print(f"Watching {self.root_folder}")
+        while True:
+            for path in self.poll():
+                print(f"Processed: {path}")
+            time.sleep(self.poll_interval)
+
+
+def survey_watcher(root_folder, output_folder, **kwargs):
+    """Watcher with the EOL report analyses of survey_runner, source drift and SMA checks of every new line"""
+    runner = survey_runner(root_folder, output_folder)
+
+    def eol(file_path, line_name, sequence):
+        # the crab angle, gyro, network quality and shot interval analyses share one read of the report
+        runner.process_file(file_path)
+        # the runner keeps nothing between reports, the watcher collects the errors
+        runner.results.clear()
+        errors, runner.errors = runner.errors, []
+        if errors:
+            return '; '.join(f'{name or "report"}: {error}' for _, name, error in errors)
+
+    def drift(file_path, line_name, sequence):
+        # the file is the one the watcher found so the tree is not searched again
+        errors = process_sequence_source_drift(root_folder, line_name if sequence is None else str(sequence),
+                                               file_paths=[file_path])
+        if errors:
+            return '; '.join(error for _, error in errors)
+
+    def sma(file_path, line_name, sequence):
+        line_name, ave_sma = line_average_sma(file_path)
+        if ave_sma > 1:
+            print((line_name, ave_sma))
+
+    watcher = NavWatcher(root_folder, **kwargs)
+    watcher.register('EOL_Report', 'eol', eol)
+    watcher.register('SourceDrift', 'source_drift', drift)
+    watcher.register('SMA_QC', 'sma', sma)
+    return watcher
+
+
+if __name__ == '__main__':
+
+    root_dir = r'Z:\MT3007424\Murphy_KMS_3D_OBN\00_NAV'
+    output_dir = r'Y:\NAV\01_Projects\0_KMS_3D_OBN_MT3007424'
+
+    survey_watcher(root_dir, output_dir).run()
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+# the tools and the shared navigation readers in pythonProject
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..'))
+sys.path.insert(0, os.path.join(here, '..', '..', 'pythonProject'))
+
+from nav_cache import ParseCache, get_cache, set_cache
+
+
+@pytest.fixture(autouse=True)
+def parse_cache(tmp_path):
+    """Every test gets an empty parse cache of its own, the user's cache is never touched."""
+    previous = get_cache()
+    cache = ParseCache(cache_dir=str(tmp_path / 'parse_cache'))
+    set_cache(cache)
+    yield cache
+    set_cache(previous)
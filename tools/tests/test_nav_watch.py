@@ -0,0 +1,119 @@
+import os
+
+import pytest
+
+import eol_reader
+import nav_watch
+from nav_catalog import NavCatalog
+from nav_watch import NavWatcher, survey_watcher
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def set_mtime(path, mtime):
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / '00_NAV'
+    os.makedirs(root / 'Seq1001' / 'PP_SP_Range')
+    return root
+
+
+@pytest.fixture
+def watcher(root, tmp_path):
+    catalog = NavCatalog(str(root), catalog_path=str(tmp_path / 'catalog.pkl'))
+    watcher = NavWatcher(str(root), settle=5.0, recent=60.0, catalog=catalog)
+    watcher.seen = []
+    watcher.register('EOL_Report', 'record',
+                     lambda path, line, sequence: watcher.seen.append((os.path.basename(path), line, sequence)))
+    watcher.poll(now=0.0)
+    return watcher
+
+
+def eol_path(root, seq=1001):
+    return str(root / f'Seq{seq}' / 'PP_SP_Range' / f'539112{seq}-EOL_Report.csv')
+
+
+def test_new_file_processed_once_settled(root, watcher):
+    path = eol_path(root)
+    write(path, 'first rows\n')
+    assert watcher.poll(now=100.0) == []
+    assert watcher.poll(now=102.0) == []
+    assert watcher.poll(now=106.0) == [path]
+    assert watcher.seen == [('5391121001-EOL_Report.csv', '5391121001', 1001)]
+    assert watcher.poll(now=200.0) == []
+
+
+def test_listing_taken_mid_write_not_processed_twice(root, watcher):
+    # the directory is listed while the report is still being copied
+    path = eol_path(root)
+    write(path, 'first rows\n')
+    set_mtime(path, 50.0)
+    watcher.poll(now=100.0)
+
+    # the copy finishes without touching the directory, the file settles and is processed
+    with open(path, 'a') as f:
+        f.write('last rows\n')
+    set_mtime(path, 101.0)
+    watcher.poll(now=101.0)
+    assert watcher.poll(now=110.0) == [path]
+
+    # a sibling product lands and the directory is listed again, the report is unchanged
+    write(str(root / 'Seq1001' / 'PP_SP_Range' / '5391121001-SMA_QC.csv'), 'sma\n')
+    for now in (120.0, 130.0, 200.0):
+        assert watcher.poll(now=now) == []
+    assert len(watcher.seen) == 1
+
+
+def test_rewritten_file_processed_again(root, watcher):
+    path = eol_path(root)
+    write(path, 'first rows\n')
+    set_mtime(path, 50.0)
+    watcher.poll(now=100.0)
+    assert watcher.poll(now=106.0) == [path]
+
+    # rewritten in place within recent seconds of processing
+    write(path, 'reprocessed rows\n')
+    set_mtime(path, 110.0)
+    watcher.poll(now=110.0)
+    assert watcher.poll(now=116.0) == [path]
+    assert len(watcher.seen) == 2
+
+
+def test_handler_errors_collected(root, watcher):
+    watcher.register('EOL_Report', 'failing', lambda path, line, sequence: 'bad report')
+    path = eol_path(root)
+    write(path, 'rows\n')
+    watcher.poll(now=100.0)
+    assert watcher.poll(now=106.0) == [path]
+    assert watcher.errors == [(path, 'failing', 'bad report')]
+
+
+def test_survey_watcher_handlers(root, tmp_path, monkeypatch):
+    drifts, opened = [], []
+    map_file = eol_reader._map_file
+    monkeypatch.setattr(eol_reader, '_map_file', lambda path: opened.append(path) or map_file(path))
+    monkeypatch.setattr(nav_watch, 'process_sequence_source_drift',
+                        lambda root_folder, sequence, file_paths: drifts.append((sequence, file_paths)) or [])
+    catalog = NavCatalog(str(root), catalog_path=str(tmp_path / 'catalog.pkl'))
+    watcher = survey_watcher(str(root), str(tmp_path / 'QC'), settle=5.0, catalog=catalog)
+    # one handler runs every EOL report analysis on a single read of the report
+    assert [name for name, _ in watcher.handlers['EOL_Report']] == ['eol']
+    watcher.poll(now=0.0)
+
+    # the sequence comes from the folder, not from the end of the line name
+    drift = str(root / 'Seq1002' / 'PP_SP_Range' / '5391121001-SourceDrift.csv')
+    write(drift, 'drift\n')
+    eol = eol_path(root)
+    write(eol, 'not a report\n')
+    watcher.poll(now=100.0)
+    assert sorted(watcher.poll(now=106.0)) == sorted([drift, eol])
+    assert drifts == [('1002', [drift])]
+    assert opened == [eol]
+    assert watcher.errors == []